@@ -0,0 +1,311 @@
+"""Background workers that keep bookkeeping writes off the request path."""
+
+from __future__ import annotations
+
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from agent_event_bus.storage import Event, SQLiteStorage
+
+logger = logging.getLogger("agent-event-bus")
+
+# How long the writer keeps draining after the first queued item before committing
+WRITE_BATCH_WINDOW = 0.05  # seconds
+
+# Event inserts: commit at most this many per transaction, waiting this long for company
+EVENT_BATCH_MAX = 32
+EVENT_BATCH_WINDOW = 0.002  # seconds
+
+# Pending notifications beyond this are dropped (a burst of DMs shouldn't pile up popups)
+NOTIFICATION_QUEUE_SIZE = 100
+
+_HEARTBEAT = "heartbeat"
+_CURSOR = "cursor"
+_STOP = "stop"
+
+
+class SessionWriteQueue:
+    """Write-behind queue for session heartbeat and cursor updates.
+
+    Heartbeats and cursor high-water marks are bookkeeping: persisting them a few
+    milliseconds late is harmless, but writing them inline makes every poll wait
+    on a SQLite commit. A single daemon thread drains the queue, keeps only the
+    latest value per session, and commits each batch in one transaction.
+    """
+
+    def __init__(self, storage: SQLiteStorage, batch_window: float = WRITE_BATCH_WINDOW):
+        self._storage = storage
+        self._batch_window = batch_window
+        self._queue: queue.SimpleQueue[tuple[str, str, object]] = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start the writer thread (idempotent)."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="agent-event-bus-session-writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Flush pending writes and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put((_STOP, "", None))
+        self._thread.join(timeout)
+        self._thread = None
+
+    def put_heartbeat(self, session_id: str, timestamp: datetime) -> None:
+        """Queue a heartbeat update."""
+        self._queue.put((_HEARTBEAT, session_id, timestamp))
+
+    def put_cursor(self, session_id: str, cursor: str) -> None:
+        """Queue a cursor (high-water mark) update."""
+        self._queue.put((_CURSOR, session_id, cursor))
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._batch_window
+            while batch[-1][0] != _STOP:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._flush(batch)
+            if batch[-1][0] == _STOP:
+                return
+
+    def _flush(self, batch: list[tuple[str, str, object]]) -> None:
+        """Commit a batch, keeping only the latest value per session."""
+        heartbeats: dict[str, datetime] = {}
+        cursors: dict[str, str] = {}
+        for kind, session_id, value in batch:
+            if kind == _HEARTBEAT:
+                heartbeats[session_id] = value
+            elif kind == _CURSOR:
+                cursors[session_id] = value
+
+        try:
+            if heartbeats:
+                self._storage.update_heartbeats(heartbeats)
+            if cursors:
+                self._storage.update_session_cursors(cursors)
+        except Exception as e:
+            # Bookkeeping only - never let a failed flush kill the writer thread
+            logger.warning(f"Failed to flush session writes: {e}")
+
+
+class EventBatcher:
+    """Coalesces concurrent event inserts into shared transactions.
+
+    Unlike heartbeats, callers need the assigned event ID, so each submission
+    gets a Future that resolves once its batch commits. A burst of publishes
+    pays for one commit instead of one each.
+    """
+
+    def __init__(
+        self,
+        storage: SQLiteStorage,
+        max_batch: int = EVENT_BATCH_MAX,
+        batch_window: float = EVENT_BATCH_WINDOW,
+    ):
+        self._storage = storage
+        self._max_batch = max_batch
+        self._batch_window = batch_window
+        self._queue: queue.SimpleQueue[tuple[tuple[str, str, str, str], Future[Event]] | None] = (
+            queue.SimpleQueue()
+        )
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start the writer thread (idempotent)."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="agent-event-bus-event-writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Commit pending events and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, event_type: str, payload: str, session_id: str, channel: str) -> Future[Event]:
+        """Queue an event insert. The Future resolves to the stored Event."""
+        future: Future[Event] = Future()
+        self._queue.put(((event_type, payload, session_id, channel), future))
+        return future
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            stopping = False
+            deadline = time.monotonic() + self._batch_window
+            while len(batch) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if stopping:
+                return
+
+    def _flush(self, batch: list[tuple[tuple[str, str, str, str], Future[Event]]]) -> None:
+        """Insert a batch in one transaction and resolve its futures."""
+        # Skip submissions the caller gave up on (they fell back to a direct insert)
+        batch = [(row, future) for row, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            events = self._storage.add_events([row for row, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), event in zip(batch, events, strict=True):
+            future.set_result(event)
+
+
+class NotificationQueue:
+    """Fire-and-forget delivery of system notifications.
+
+    Spawning terminal-notifier/osascript/notify-send can take tens of
+    milliseconds; a daemon thread sends them so publishers don't wait. The
+    queue is bounded and drops new notifications when full.
+    """
+
+    def __init__(
+        self,
+        send: Callable[..., bool],
+        maxsize: int = NOTIFICATION_QUEUE_SIZE,
+    ):
+        self._send = send
+        self._queue: queue.Queue[tuple[str, str, bool] | None] = queue.Queue(maxsize)
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start the delivery thread (idempotent)."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="agent-event-bus-notifier", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Deliver queued notifications and stop the delivery thread."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def put(self, title: str, message: str, sound: bool = False) -> bool:
+        """Queue a notification. Returns False if it was dropped because the queue is full."""
+        try:
+            self._queue.put_nowait((title, message, sound))
+        except queue.Full:
+            logger.warning(f"Notification queue full, dropping: {title}")
+            return False
+        return True
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            title, message, sound = item
+            try:
+                self._send(title=title, message=message, sound=sound)
+            except Exception as e:
+                logger.warning(f"Failed to send notification '{title}': {e}")
+
+
+class PeriodicTask:
+    """Runs a maintenance callable on a daemon thread at a fixed interval.
+
+    Used for sweeps that don't belong on any particular request (e.g. stale
+    session cleanup). The first run happens immediately on start; a failing
+    run is logged and the schedule continues.
+    """
+
+    def __init__(self, func: Callable[[], object], interval: float, name: str):
+        self._func = func
+        self._interval = interval
+        self._name = name
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start the worker thread (idempotent)."""
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"agent-event-bus-{self._name}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop the worker thread, letting an in-progress run finish."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self._func()
+            except Exception as e:
+                logger.warning(f"Periodic task {self._name} failed: {e}")
+            if self._stopping.wait(self._interval):
+                return
+
+
+def start_log_listener(log: logging.Logger) -> logging.handlers.QueueListener | None:
+    """Move a logger's handlers behind a queue drained by a background thread.
+
+    The logger keeps a single QueueHandler, so a log call only enqueues the
+    record; file and console writes happen on the listener thread. Returns
+    the started listener (stop() flushes it), or None if the logger has no
+    handlers to move.
+    """
+    handlers = [h for h in log.handlers if not isinstance(h, logging.handlers.QueueHandler)]
+    if not handlers:
+        return None
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    for handler in handlers:
+        log.removeHandler(handler)
+    log.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener.start()
+    return listener
@@ -53,18 +53,48 @@ Examples:
 """
 
 import argparse
-import json
+import atexit
 import os
 import sys
+from typing import TYPE_CHECKING
 
-import requests
+from agent_event_bus import json_compat
+
+# requests (and urllib3 etc.) is imported on first use - it dominates cold start,
+# and --help or argument errors never touch the network
+if TYPE_CHECKING:
+    import requests
 
 DEFAULT_URL = "http://127.0.0.1:8080/mcp"
 HEADERS = {
     "Content-Type": "application/json",
     "Accept": "application/json, text/event-stream",
+    "Connection": "keep-alive",
 }
 
+# Shared HTTP session so repeated calls in one process reuse keep-alive connections
+_http: "requests.Session | None" = None
+
+
+def _http_session() -> "requests.Session":
+    """Return the process-wide HTTP session, creating it on first use."""
+    global _http
+    if _http is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        _http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        _http.mount("http://", adapter)
+        _http.mount("https://", adapter)
+        atexit.register(_http.close)
+    return _http
+
+
+def _eprint(msg: str) -> None:
+    """Write a line to stderr (looked up per call so redirection still works)."""
+    sys.stderr.write(f"{msg}\n")
+
 
 def call_tool(
     tool_name: str,
@@ -82,9 +112,11 @@ def call_tool(
         timeout_ms: Timeout in milliseconds (default: 10000)
         debug: If True, show full stack traces on errors
     """
+    import requests
+
     timeout_sec = (timeout_ms / 1000) if timeout_ms else 10
     try:
-        resp = requests.post(
+        resp = _http_session().post(
             url or DEFAULT_URL,
             headers=HEADERS,
             json={
@@ -94,31 +126,42 @@ def call_tool(
                 "params": {"name": tool_name, "arguments": arguments},
             },
             timeout=timeout_sec,
+            stream=True,
         )
-        resp.raise_for_status()
-
-        # Parse SSE response
-        for line in resp.text.split("\n"):
-            if line.startswith("data: "):
-                data = json.loads(line[6:])
-                result = data.get("result", {})
-                # Try structured content first, fall back to text
-                structured = result.get("structuredContent", {}).get("result")
-                if structured is not None:
-                    return structured
-                content = result.get("content", [])
-                if content and content[0].get("text"):
-                    return json.loads(content[0]["text"])
-                return result
-        return {}
+        try:
+            resp.raise_for_status()
+
+            # Parse SSE response line by line, without decoding or splitting the whole body.
+            # Stop at the first data frame: anything after it (keep-alive pings, stream
+            # close) is unused, and waiting for it could block until the timeout.
+            data_line = None
+            for line in resp.iter_lines(chunk_size=8192):
+                if line.startswith(b"data: "):
+                    data_line = line[6:]
+                    break
+        finally:
+            resp.close()
+
+        if data_line is None:
+            return {}
+        data = json_compat.loads(data_line)
+        result = data.get("result", {})
+        # Try structured content first, fall back to text
+        structured = result.get("structuredContent", {}).get("result")
+        if structured is not None:
+            return structured
+        content = result.get("content", [])
+        if content and content[0].get("text"):
+            return json_compat.loads(content[0]["text"])
+        return result
     except requests.exceptions.ConnectionError:
-        print("Error: Cannot connect to agent event bus. Is it running?", file=sys.stderr)
-        print("Start with: agent-event-bus", file=sys.stderr)
+        _eprint("Error: Cannot connect to agent event bus. Is it running?")
+        _eprint("Start with: agent-event-bus")
         sys.exit(1)
     except Exception as e:
         if debug:
             raise
-        print(f"Error: {e}", file=sys.stderr)
+        _eprint(f"Error: {e}")
         sys.exit(1)
 
 
@@ -135,15 +178,15 @@ def cmd_register(args):
     arguments["cwd"] = os.getcwd()
 
     result = call_tool("register_session", arguments, url=args.url, debug=args.debug)
-    print(json.dumps(result, indent=2))
+    print(json_compat.dumps_indent(result))
 
     # Print session info for easy capture in scripts
     if "session_id" in result:
         display_id = result.get("display_id") or result.get("session_id")
-        print(f"\nRegistered as: {display_id}", file=sys.stderr)
+        _eprint(f"\nRegistered as: {display_id}")
         # Only show session_id if different from display_id (UUID case)
         if result.get("session_id") != display_id:
-            print(f"Session ID: {result['session_id']}", file=sys.stderr)
+            _eprint(f"Session ID: {result['session_id']}")
 
 
 def cmd_unregister(args):
@@ -155,11 +198,11 @@ def cmd_unregister(args):
         arguments["client_id"] = args.client_id
 
     if not arguments:
-        print("Error: Must provide --session-id or --client-id", file=sys.stderr)
+        _eprint("Error: Must provide --session-id or --client-id")
         sys.exit(1)
 
     result = call_tool("unregister_session", arguments, url=args.url, debug=args.debug)
-    print(json.dumps(result, indent=2))
+    print(json_compat.dumps_indent(result))
 
 
 def cmd_sessions(args):
@@ -169,28 +212,30 @@ def cmd_sessions(args):
         print("No active sessions")
         return
 
-    print(f"Active sessions ({len(result)}):\n")
+    lines = [f"Active sessions ({len(result)}):\n"]
     for s in result:
+        get = s.get
         # Show display_id (human-readable) prominently, with name
-        display_id = s.get("display_id") or s.get("session_id", "?")
-        print(f"  {display_id}  {s['name']}")
-        print(f"    repo: {s['repo']}, machine: {s['machine']}")
+        display_id = get("display_id") or get("session_id", "?")
+        lines.append(f"  {display_id}  {s['name']}")
+        lines.append(f"    repo: {s['repo']}, machine: {s['machine']}")
         # Show client_id if present (needed for statusline lookup)
-        client_id = s.get("client_id")
+        client_id = get("client_id")
         if client_id:
-            print(f"    client_id: {client_id}")
-        print(f"    age: {int(s['age_seconds'])}s")
+            lines.append(f"    client_id: {client_id}")
+        lines.append(f"    age: {int(s['age_seconds'])}s")
         # Show session_id (UUID) separately if different from display_id
-        session_id = s.get("session_id", "")
+        session_id = get("session_id", "")
         if session_id and session_id != display_id:
             # Truncate long UUIDs for display
             if len(session_id) > 16:
                 session_id = session_id[:8] + "…"
-            print(f"    session_id: {session_id}")
-        channels = s.get("subscribed_channels", [])
+            lines.append(f"    session_id: {session_id}")
+        channels = get("subscribed_channels")
         if channels:
-            print(f"    channels: {', '.join(channels)}")
-        print()
+            lines.append(f"    channels: {', '.join(channels)}")
+        lines.append("")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def cmd_channels(args):
@@ -200,14 +245,16 @@ def cmd_channels(args):
         print("No active channels")
         return
 
-    print(f"Active channels ({len(result)}):\n")
+    lines = [f"Active channels ({len(result)}):\n"]
     for ch in result:
-        channel_name = ch.get("channel", "<unknown>")
-        subscriber_count = ch.get("subscribers", 0)
-        print(
+        get = ch.get
+        channel_name = get("channel", "<unknown>")
+        subscriber_count = get("subscribers", 0)
+        lines.append(
             f"  {channel_name}  ({subscriber_count} subscriber{'s' if subscriber_count != 1 else ''})"
         )
-    print()
+    lines.append("")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def cmd_publish(args):
@@ -224,14 +271,14 @@ def cmd_publish(args):
         arguments["session_id"] = session_id
 
     result = call_tool("publish_event", arguments, url=args.url, debug=args.debug)
-    print(json.dumps(result, indent=2))
+    print(json_compat.dumps_indent(result))
 
 
 def cmd_events(args):
     """Get recent events."""
     # Validate --resume requires --session-id
     if args.resume and not args.session_id:
-        print("Error: --resume requires --session-id", file=sys.stderr)
+        _eprint("Error: --resume requires --session-id")
         sys.exit(1)
 
     cursor = args.cursor
@@ -247,7 +294,8 @@ def cmd_events(args):
     if args.resume:
         arguments["resume"] = True
     if args.include:
-        arguments["event_types"] = [t.strip() for t in args.include.split(",")]
+        # Dedupe (order-preserving) so the server matches each type once
+        arguments["event_types"] = list(dict.fromkeys(t.strip() for t in args.include.split(",")))
 
     result = call_tool(
         "get_events", arguments, url=args.url, timeout_ms=args.timeout, debug=args.debug
@@ -257,24 +305,34 @@ def cmd_events(args):
     events = result.get("events", [])
     next_cursor = result.get("next_cursor")
 
-    # Apply --exclude filter (client-side for flexibility)
-    if args.exclude:
-        exclude_set = {t.strip() for t in args.exclude.split(",")}
-        events = [e for e in events if e["event_type"] not in exclude_set]
+    # --exclude filter is applied client-side for flexibility
+    exclude_set = (
+        frozenset(t.strip() for t in args.exclude.split(",")) if args.exclude else frozenset()
+    )
 
     # Output format
     if args.json:
+        if exclude_set:
+            events = [e for e in events if e["event_type"] not in exclude_set]
         output = {"events": events, "next_cursor": next_cursor}
-        print(json.dumps(output))
+        if "suggested_next_poll_ms" in result:
+            output["suggested_next_poll_ms"] = result["suggested_next_poll_ms"]
+        print(json_compat.dumps(output))
     else:
-        if not events:
+        # Filter and format in one pass, then write everything at once
+        lines = []
+        for e in events:
+            if e["event_type"] in exclude_set:
+                continue
+            lines.append(
+                f"[{e['id']}] {e['event_type']} ({e['channel']})\n"
+                f"    {e['payload']}\n"
+                f"    from: {e['session_id']} at {e['timestamp']}\n"
+            )
+        if not lines:
             print("No events")
             return
-        for e in events:
-            print(f"[{e['id']}] {e['event_type']} ({e['channel']})")
-            print(f"    {e['payload']}")
-            print(f"    from: {e['session_id']} at {e['timestamp']}")
-            print()
+        sys.stdout.write("\n".join(lines) + "\n")
 
 
 def cmd_notify(args):
@@ -290,111 +348,116 @@ def cmd_notify(args):
     if result.get("success"):
         print("Notification sent")
     else:
-        print("Notification failed", file=sys.stderr)
+        _eprint("Notification failed")
         sys.exit(1)
 
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="CLI wrapper for agent-event-bus",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog=__doc__,
-    )
-    parser.add_argument(
-        "--url",
-        default=os.environ.get("AGENT_EVENT_BUS_URL", DEFAULT_URL),
-        help="Event bus URL (default: http://127.0.0.1:8080/mcp)",
-    )
-    parser.add_argument(
-        "--debug",
-        action="store_true",
-        help="Show full stack traces on errors",
-    )
-
-    subparsers = parser.add_subparsers(dest="command")
-
-    # register
-    p_register = subparsers.add_parser("register", help="Register a session")
-    p_register.add_argument("--name", help="Session name (default: directory name)")
-    p_register.add_argument(
+def _add_register_args(p):
+    p.add_argument("--name", help="Session name (default: directory name)")
+    p.add_argument(
         "--client-id", help="Client identifier for deduplication (e.g., CC session ID or PID)"
     )
-    p_register.set_defaults(func=cmd_register)
 
-    # unregister
-    p_unregister = subparsers.add_parser("unregister", help="Unregister a session")
-    p_unregister.add_argument("--session-id", help="Session ID")
-    p_unregister.add_argument(
+
+def _add_unregister_args(p):
+    p.add_argument("--session-id", help="Session ID")
+    p.add_argument(
         "--client-id",
         help="Client ID (alternative to --session-id, looks up by machine + client_id)",
     )
-    p_unregister.set_defaults(func=cmd_unregister)
-
-    # sessions
-    p_sessions = subparsers.add_parser("sessions", help="List active sessions")
-    p_sessions.set_defaults(func=cmd_sessions)
-
-    # channels
-    p_channels = subparsers.add_parser("channels", help="List active channels")
-    p_channels.set_defaults(func=cmd_channels)
-
-    # publish
-    p_publish = subparsers.add_parser("publish", help="Publish an event")
-    p_publish.add_argument("--type", required=True, help="Event type")
-    p_publish.add_argument("--payload", required=True, help="Event payload")
-    p_publish.add_argument("--channel", default="all", help="Target channel")
-    p_publish.add_argument(
-        "--session-id", help="Your session ID (default: $AGENT_EVENT_BUS_SESSION_ID)"
-    )
-    p_publish.set_defaults(func=cmd_publish)
-
-    # events
-    p_events = subparsers.add_parser("events", help="Get recent events")
-    p_events.add_argument("--cursor", help="Cursor from previous call (for pagination)")
-    p_events.add_argument("--session-id", help="Your session ID (for cursor tracking)")
-    p_events.add_argument("--limit", type=int, help="Maximum number of events to return")
-    p_events.add_argument(
+
+
+def _add_publish_args(p):
+    p.add_argument("--type", required=True, help="Event type")
+    p.add_argument("--payload", required=True, help="Event payload")
+    p.add_argument("--channel", default="all", help="Target channel")
+    p.add_argument("--session-id", help="Your session ID (default: $AGENT_EVENT_BUS_SESSION_ID)")
+
+
+def _add_events_args(p):
+    p.add_argument("--cursor", help="Cursor from previous call (for pagination)")
+    p.add_argument("--session-id", help="Your session ID (for cursor tracking)")
+    p.add_argument("--limit", type=int, help="Maximum number of events to return")
+    p.add_argument(
         "--exclude",
         help="Comma-separated event types to exclude (e.g., session_registered,session_unregistered)",
     )
-    p_events.add_argument(
+    p.add_argument(
         "--timeout",
         type=int,
         default=10000,
         help="Request timeout in milliseconds (default: 10000)",
     )
-    p_events.add_argument(
+    p.add_argument(
         "--json",
         action="store_true",
-        help="Output as JSON with events array and next_cursor",
+        help="Output as JSON with events array, next_cursor, and suggested_next_poll_ms",
     )
-    p_events.add_argument(
+    p.add_argument(
         "--order",
         choices=["asc", "desc"],
         default="desc",
         help="Ordering: 'desc' for newest first (default), 'asc' for oldest first",
     )
-    p_events.add_argument(
+    p.add_argument(
         "--channel",
         help="Filter to a specific channel (e.g., 'repo:my-project', 'all')",
     )
-    p_events.add_argument(
+    p.add_argument(
         "--resume",
         action="store_true",
         help="Resume from saved cursor position (requires --session-id, ignored if --cursor provided)",
     )
-    p_events.add_argument(
+    p.add_argument(
         "--include",
         help="Comma-separated event types to include (e.g., task_completed,ci_completed)",
     )
-    p_events.set_defaults(func=cmd_events)
-
-    # notify
-    p_notify = subparsers.add_parser("notify", help="Send system notification")
-    p_notify.add_argument("--title", required=True, help="Notification title")
-    p_notify.add_argument("--message", required=True, help="Notification message")
-    p_notify.add_argument("--sound", action="store_true", help="Play sound")
-    p_notify.set_defaults(func=cmd_notify)
+
+
+def _add_notify_args(p):
+    p.add_argument("--title", required=True, help="Notification title")
+    p.add_argument("--message", required=True, help="Notification message")
+    p.add_argument("--sound", action="store_true", help="Play sound")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="CLI wrapper for agent-event-bus",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument(
+        "--url",
+        default=os.environ.get("AGENT_EVENT_BUS_URL", DEFAULT_URL),
+        help="Event bus URL (default: http://127.0.0.1:8080/mcp)",
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Show full stack traces on errors",
+    )
+
+    subparsers = parser.add_subparsers(dest="command")
+
+    # name -> (help, argument builder, handler)
+    commands = {
+        "register": ("Register a session", _add_register_args, cmd_register),
+        "unregister": ("Unregister a session", _add_unregister_args, cmd_unregister),
+        "sessions": ("List active sessions", None, cmd_sessions),
+        "channels": ("List active channels", None, cmd_channels),
+        "publish": ("Publish an event", _add_publish_args, cmd_publish),
+        "events": ("Get recent events", _add_events_args, cmd_events),
+        "notify": ("Send system notification", _add_notify_args, cmd_notify),
+    }
+
+    # Every command is listed (for --help), but only commands named on the
+    # command line get their arguments - hooks invoke one command per process
+    argv = set(sys.argv[1:])
+    for name, (help_text, add_args, func) in commands.items():
+        p = subparsers.add_parser(name, help=help_text)
+        if add_args is not None and name in argv:
+            add_args(p)
+        p.set_defaults(func=func)
 
     args = parser.parse_args()
 
@@ -1,33 +1,65 @@
 """Helper utilities for the event bus server."""
 
+import functools
 import logging
 import os
 import platform
 import shutil
 import subprocess
+import time
 
 logger = logging.getLogger("agent-event-bus")
 
+# Read once at import; server call sites check this before formatting dev notifications
+DEV_MODE = bool(os.environ.get("DEV_MODE"))
+
+LIVENESS_CACHE_TTL = 1.0  # Seconds to trust a PID liveness result
+
+# PID -> (monotonic time checked, alive); expired entries are pruned about once per TTL
+_liveness_cache: dict[int, tuple[float, bool]] = {}
+_liveness_pruned_at = 0.0
+
+# Backslash and double quote are the only specials inside an AppleScript string literal
+_APPLESCRIPT_ESCAPE = str.maketrans({"\\": "\\\\", '"': '\\"'})
+
+# Notifier output is never used; only stderr is kept, for failure logs
+_RUN_OUTPUT = {"stdout": subprocess.DEVNULL, "stderr": subprocess.PIPE}
+
+# Fixed terminal-notifier options appended after -title/-message
+_TERMINAL_NOTIFIER_OPTS = (
+    "-group",
+    "agent-event-bus",  # Group notifications together
+    "-sender",
+    "com.apple.Terminal",  # Use Terminal's notification permissions
+)
+_TERMINAL_NOTIFIER_SOUND = ("-sound", "default")
+
+
+# Newlines/tabs in names break single-line displays; map them all to spaces in one pass
+_SANITIZE_TABLE = str.maketrans({"\n": " ", "\t": " ", "\r": " "})
+
 
 def _sanitize_name(name: str) -> str:
     """Sanitize a name by replacing problematic characters."""
-    return name.replace("\n", " ").replace("\t", " ").replace("\r", " ")
+    return name.translate(_SANITIZE_TABLE)
 
 
+@functools.lru_cache(maxsize=256)
 def extract_repo_from_cwd(cwd: str) -> str:
     """Extract repo name from working directory.
 
     Sanitizes the result to remove newlines/tabs that could cause display issues.
+    Cached: sessions re-register from the same few working directories.
     """
-    # Try to get git repo name
-    parts = cwd.rstrip("/").split("/")
-    # Look for common patterns like .worktrees/branch-name
-    if ".worktrees" in parts:
-        idx = parts.index(".worktrees")
-        if idx > 0:
-            return _sanitize_name(parts[idx - 1])
+    path = cwd.rstrip("/")
+    # Look for common patterns like .worktrees/branch-name (substring test first,
+    # so ordinary paths never pay for splitting)
+    if ".worktrees" in path:
+        head, sep, _ = f"/{path}/".partition("/.worktrees/")
+        if sep and head:
+            return _sanitize_name(head.rpartition("/")[2])
     # Fall back to last directory component
-    last = parts[-1] if parts else ""
+    last = path.rpartition("/")[2]
     return _sanitize_name(last) if last else "unknown"
 
 
@@ -54,14 +86,56 @@ def is_client_alive(client_id: str | None, is_local: bool) -> bool:
         logger.debug(f"Skipping liveness check for non-numeric client_id: {client_id}")
         return True  # Non-numeric client_id, can't check, assume alive
 
+    # Reuse a recent result so repeated sweeps cost one syscall per PID per TTL
+    now = time.monotonic()
+    cached = _liveness_cache.get(pid)
+    if cached is not None and now - cached[0] < LIVENESS_CACHE_TTL:
+        return cached[1]
+
     # Check PID liveness
     try:
         os.kill(pid, 0)  # Signal 0 = check if process exists
-        return True
+        alive = True
     except ProcessLookupError:
-        return False
+        alive = False
     except PermissionError:
-        return True  # Process exists but we can't signal it
+        alive = True  # Process exists but we can't signal it
+
+    _prune_liveness_cache(now)
+    _liveness_cache[pid] = (now, alive)
+    return alive
+
+
+def _prune_liveness_cache(now: float) -> None:
+    """Drop expired liveness results, so PIDs of sessions deleted elsewhere don't pile up."""
+    global _liveness_pruned_at
+    if now - _liveness_pruned_at < LIVENESS_CACHE_TTL:
+        return
+    _liveness_pruned_at = now
+    for pid in [
+        pid for pid, (checked, _) in _liveness_cache.items() if now - checked >= LIVENESS_CACHE_TTL
+    ]:
+        del _liveness_cache[pid]
+
+
+def forget_client_liveness(client_id: str | None) -> None:
+    """Drop any cached liveness result for a client (e.g. on unregister)."""
+    try:
+        _liveness_cache.pop(int(client_id), None)
+    except (TypeError, ValueError):
+        pass  # Not a PID, never cached
+
+
+@functools.cache
+def _find_executable(name: str) -> str | None:
+    """Locate a notifier binary once per process (a PATH search stats every entry)."""
+    return shutil.which(name)
+
+
+@functools.cache
+def _icon_args(icon_path: str | None) -> tuple[str, ...]:
+    """terminal-notifier icon arguments, checking that the file exists once per path."""
+    return ("-appIcon", icon_path) if icon_path and os.path.exists(icon_path) else ()
 
 
 def escape_applescript_string(s: str) -> str:
@@ -69,7 +143,7 @@ def escape_applescript_string(s: str) -> str:
 
     Prevents command injection by escaping backslashes and double quotes.
     """
-    return s.replace("\\", "\\\\").replace('"', '\\"')
+    return s.translate(_APPLESCRIPT_ESCAPE)
 
 
 def send_notification(title: str, message: str, sound: bool = False) -> bool:
@@ -83,27 +157,20 @@ def send_notification(title: str, message: str, sound: bool = False) -> bool:
     try:
         if system == "Darwin":  # macOS
             # Prefer terminal-notifier for custom icon support
-            if shutil.which("terminal-notifier"):
+            if _find_executable("terminal-notifier"):
                 cmd = [
                     "terminal-notifier",
                     "-title",
                     title,
                     "-message",
                     message,
-                    "-group",
-                    "agent-event-bus",  # Group notifications together
-                    "-sender",
-                    "com.apple.Terminal",  # Use Terminal's notification permissions
+                    *_TERMINAL_NOTIFIER_OPTS,
+                    *(_TERMINAL_NOTIFIER_SOUND if sound else ()),
+                    # Custom icon support via environment variable
+                    *_icon_args(os.environ.get("AGENT_EVENT_BUS_ICON")),
                 ]
-                if sound:
-                    cmd.extend(["-sound", "default"])
-
-                # Custom icon support via environment variable
-                icon_path = os.environ.get("AGENT_EVENT_BUS_ICON")
-                if icon_path and os.path.exists(icon_path):
-                    cmd.extend(["-appIcon", icon_path])
 
-                subprocess.run(cmd, check=True, capture_output=True)
+                subprocess.run(cmd, check=True, **_RUN_OUTPUT)
                 return True
 
             # Fallback to osascript (no custom icon support)
@@ -113,11 +180,7 @@ def send_notification(title: str, message: str, sound: bool = False) -> bool:
             script = f'display notification "{safe_message}" with title "{safe_title}"'
             if sound:
                 script += ' sound name "default"'
-            subprocess.run(
-                ["osascript", "-e", script],
-                check=True,
-                capture_output=True,
-            )
+            subprocess.run(["osascript", "-e", script], check=True, **_RUN_OUTPUT)
             return True
 
         elif system == "Linux":
@@ -126,9 +189,9 @@ def send_notification(title: str, message: str, sound: bool = False) -> bool:
                 return False  # Headless server, can't send notifications
 
             # Check for notify-send
-            if shutil.which("notify-send"):
+            if _find_executable("notify-send"):
                 cmd = ["notify-send", title, message]
-                subprocess.run(cmd, check=True, capture_output=True)
+                subprocess.run(cmd, check=True, **_RUN_OUTPUT)
                 return True
             else:
                 return False  # notify-send not available
@@ -137,13 +200,10 @@ def send_notification(title: str, message: str, sound: bool = False) -> bool:
             return False  # Unsupported platform
 
     except subprocess.CalledProcessError as e:
-        # Include stderr/stdout for debugging
+        # Include stderr for debugging
         stderr = e.stderr.decode() if e.stderr else "no stderr"
-        stdout = e.stdout.decode() if e.stdout else "no stdout"
         logger.error(
-            f"Notification command failed (exit code {e.returncode}): {e.cmd}\n"
-            f"Stdout: {stdout}\n"
-            f"Stderr: {stderr}"
+            f"Notification command failed (exit code {e.returncode}): {e.cmd}\nStderr: {stderr}"
         )
         return False
 
@@ -0,0 +1,44 @@
+"""JSON encode/decode with an optional orjson fast path.
+
+orjson is used when installed (``pip install agent-event-bus[fast]``);
+otherwise the stdlib json module is used. Output from the two backends is
+equivalent JSON but not byte-identical (orjson emits no spaces).
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+if orjson is not None:
+
+    def loads(data: str | bytes | bytearray) -> Any:
+        """Parse JSON from str, bytes, or bytearray."""
+        return orjson.loads(data)
+
+    def dumps(obj: Any) -> str:
+        """Serialize to a compact JSON string."""
+        return orjson.dumps(obj).decode()
+
+    def dumps_indent(obj: Any) -> str:
+        """Serialize to a human-readable JSON string indented by two spaces."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+else:
+
+    def loads(data: str | bytes | bytearray) -> Any:
+        """Parse JSON from str, bytes, or bytearray."""
+        return json.loads(data)
+
+    def dumps(obj: Any) -> str:
+        """Serialize to a JSON string."""
+        return json.dumps(obj)
+
+    def dumps_indent(obj: Any) -> str:
+        """Serialize to a human-readable JSON string indented by two spaces."""
+        return json.dumps(obj, indent=2)
@@ -2,10 +2,17 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import heapq
 import json
 import logging
+import re
+import time
 from typing import TYPE_CHECKING
 
+from agent_event_bus import json_compat
+
 if TYPE_CHECKING:
     from agent_event_bus.storage import SQLiteStorage
 
@@ -23,6 +30,33 @@ def _get_storage() -> SQLiteStorage:
     return storage
 
 
+SESSIONS_MAP_TTL = 1.0  # Seconds to reuse the session_id → display_id map across log lines
+MAX_LOG_BODY = 64 * 1024  # Request/response bytes buffered for one log line
+
+# (monotonic time loaded, session_id → display_id), or None if not loaded
+_sessions_map_cache: tuple[float, dict[str, str]] | None = None
+
+
+def invalidate_sessions_map() -> None:
+    """Drop the cached session map (call when sessions are registered/removed)."""
+    global _sessions_map_cache
+    _sessions_map_cache = None
+
+
+def _fresh_sessions_map() -> dict[str, str] | None:
+    """Return the cached session map if it is still within its TTL."""
+    cached = _sessions_map_cache  # Read once - another thread may invalidate it
+    if cached is not None and time.monotonic() - cached[0] < SESSIONS_MAP_TTL:
+        return cached[1]
+    return None
+
+
+async def _refresh_sessions_map() -> None:
+    """Reload a stale session map in a worker thread, keeping the query off the event loop."""
+    if _fresh_sessions_map() is None:
+        await asyncio.to_thread(_get_active_sessions_map)
+
+
 def _lookup_session_display_id(session_id: str) -> str | None:
     """Look up human-readable display_id from a session_id.
 
@@ -31,25 +65,28 @@ def _lookup_session_display_id(session_id: str) -> str | None:
 
     Returns the display_id if found, None otherwise.
     """
-    try:
-        storage = _get_storage()
-        session = storage.get_session(session_id)
-        return session.display_id if session else None
-    except Exception:
-        return None
+    # Only active sessions resolve, so the active map answers this without a query
+    return _get_active_sessions_map().get(session_id)
 
 
 def _get_active_sessions_map() -> dict[str, str]:
     """Get mapping of session_id → display_id for active sessions.
 
     Returns a dict where keys are session IDs (UUIDs) and values are
-    human-readable display_ids (like "brave-tiger").
+    human-readable display_ids (like "brave-tiger"). The map is reused for
+    SESSIONS_MAP_TTL seconds so a burst of logged requests costs one query.
     """
+    global _sessions_map_cache
+    cached = _fresh_sessions_map()
+    if cached is not None:
+        return cached
     try:
         storage = _get_storage()
-        return {s.id: s.display_id for s in storage.list_sessions()}
+        sessions_map = {s.id: s.display_id for s in storage.list_sessions()}
     except Exception:
         return {}
+    _sessions_map_cache = (time.monotonic(), sessions_map)
+    return sessions_map
 
 
 # ANSI color codes for tail -f viewing
@@ -63,6 +100,36 @@ _RED = "\033[31m"
 _DIM = "\033[2m"
 _RESET = "\033[0m"
 
+# Prebuilt %-templates for the per-argument/per-ID pieces of each log line
+_BOLD_TMPL = f"{_BOLD}%s{_RESET}"
+_CYAN_TMPL = f"{_CYAN}%s{_RESET}"
+_DIM_TMPL = f"{_DIM}%s{_RESET}"
+_DIM_TRUNC_TMPL = f"{_DIM}%s…{_RESET}"
+_ID_ARG_TMPL = f"{_CYAN}%s{_RESET}=%s"
+_HIGHLIGHT_ARG_TMPL = f"{_CYAN}%s{_RESET}={_BOLD}%s{_RESET}"
+_RED_TMPL = f"{_RED}%s{_RESET}"
+_CALLER_TMPL = f"{_CYAN}[%s]{_RESET} "
+_UNRESOLVED_CALLER_TMPL = f"{_DIM}[%s…]{_RESET} "
+_TIMESPAN_TMPL = f"{_DIM}%s → %s{_RESET}"
+
+# Fixed result strings
+_EMPTY = f"{_DIM}empty{_RESET}"
+_TRUNCATED = f"{_DIM}<truncated>{_RESET}"
+_OK = f"{_GREEN}OK{_RESET}"
+_FAILED = f"{_RED}FAILED{_RESET}"
+
+# Fields to highlight with colors (key identifiers only)
+_HIGHLIGHT_FIELDS = frozenset(("name", "channel"))
+# ID fields that should be formatted specially (dim UUIDs, bold human-readable)
+_ID_FIELDS = frozenset(("session_id", "client_id"))
+
+# Docker-style display IDs: exactly two lowercase words joined by a hyphen
+_HUMAN_READABLE_ID = re.compile(r"[a-z]+-[a-z]+\Z")
+
+# Best-effort peeks into the kept prefix of an oversized (unparseable) request body
+_RPC_METHOD = re.compile(rb'"method"\s*:\s*"([^"\\]*)"')
+_RPC_TOOL_NAME = re.compile(rb'"params"\s*:\s*\{\s*"name"\s*:\s*"([^"\\]{1,128})"')
+
 # Tool color categories
 _TOOL_COLORS = {
     # Actions with side effects (yellow)
@@ -74,6 +141,18 @@ _TOOL_COLORS = {
 }
 
 
+_ARROW = f"{_DIM}→{_RESET}"
+
+
+@functools.lru_cache(maxsize=64)
+def _colored_tool_name(tool_name: str) -> str:
+    """Color a tool name for the log line (cached - there are only a handful of tools).
+
+    Uses tool-specific colors: yellow for publish/notify, blue for get_events.
+    """
+    return f"{_TOOL_COLORS.get(tool_name, _GREEN)}{_BOLD}{tool_name}{_RESET}"
+
+
 def _is_human_readable_id(session_id: str) -> bool:
     """Check if a session ID is human-readable (Docker-style adjective-noun).
 
@@ -82,11 +161,7 @@ def _is_human_readable_id(session_id: str) -> bool:
     """
     if not session_id or session_id == "anonymous":
         return False
-    parts = session_id.split("-")
-    # Must be exactly two parts, both alphabetic lowercase
-    if len(parts) != 2:
-        return False
-    return all(part.isalpha() and part.islower() for part in parts)
+    return _HUMAN_READABLE_ID.match(session_id) is not None
 
 
 def _format_session_id_value(session_id: str) -> str:
@@ -96,70 +171,94 @@ def _format_session_id_value(session_id: str) -> str:
     UUIDs/hex strings are dimmed and truncated.
     """
     if _is_human_readable_id(session_id):
-        return f"{_BOLD}{session_id}{_RESET}"
+        return _BOLD_TMPL % session_id
     elif len(session_id) > 12:
         # Truncate long UUIDs to first 8 chars
-        return f"{_DIM}{session_id[:8]}…{_RESET}"
+        return _DIM_TRUNC_TMPL % session_id[:8]
     else:
-        return f"{_DIM}{session_id}{_RESET}"
+        return _DIM_TMPL % session_id
+
+
+_JSON_CONSTANTS = {True: "true", False: "false", None: "null"}
+
+
+def _fast_json(value) -> str:
+    """JSON-encode a tool argument value, skipping the encoder for plain scalars.
+
+    Output always matches json.dumps; containers go straight to it, since orjson
+    spaces them differently and rejects some values json accepts (big ints, int keys).
+    """
+    if value is None or value is True or value is False:
+        return _JSON_CONSTANTS[value]
+    if type(value) is int:
+        return str(value)
+    if type(value) is str and value.isascii() and value.isprintable():
+        if '"' not in value and "\\" not in value:
+            return f'"{value}"'
+    return json.dumps(value)
+
 
+def _format_args(args: dict, skip: str | None = None) -> str:
+    """Format tool arguments concisely with key field highlighting.
 
-def _format_args(args: dict) -> str:
-    """Format tool arguments concisely with key field highlighting."""
+    The argument named ``skip`` (if any) is left out.
+    """
     if not args:
         return ""
     parts = []
-    # Fields to highlight with colors (key identifiers only)
-    highlight_fields = {"name", "channel"}
-    # ID fields that should be formatted specially (dim UUIDs, bold human-readable)
-    id_fields = {"session_id", "client_id"}
     for k, v in args.items():
-        if k in id_fields and isinstance(v, str):
+        if k == skip:
+            continue
+        if k in _ID_FIELDS and isinstance(v, str):
             # Special handling for ID fields - show human-readable names prominently, dim UUIDs
-            formatted_val = _format_session_id_value(v)
-            parts.append(f"{_CYAN}{k}{_RESET}={formatted_val}")
-        elif k in highlight_fields:
+            parts.append(_ID_ARG_TMPL % (k, _format_session_id_value(v)))
+        elif k in _HIGHLIGHT_FIELDS:
             # Highlight key fields: cyan key, bold value
-            val = json.dumps(v)
-            parts.append(f"{_CYAN}{k}{_RESET}={_BOLD}{val}{_RESET}")
+            parts.append(_HIGHLIGHT_ARG_TMPL % (k, _fast_json(v)))
         else:
             # Normal formatting
-            val = json.dumps(v)
-            parts.append(f"{k}={val}")
+            parts.append(f"{k}={_fast_json(v)}")
     return ", ".join(parts)
 
 
+def _format_session_list(items: list[dict]) -> str:
+    """Show session display_ids (human-readable names): tender-hawk, brave-tiger, ..."""
+    # Prefer display_id if available, look it up if not, format UUID as fallback
+    sessions_map = None  # Fetched at most once, only if some item lacks a display_id
+    names = []
+    for item in items:
+        display_id = item.get("display_id")
+        if not display_id:
+            sid = item.get("session_id", "?")
+            if sid != "?":
+                if sessions_map is None:
+                    sessions_map = _get_active_sessions_map()
+                display_id = sessions_map.get(sid)
+            if not display_id:
+                # Format the ID (dim truncated UUID)
+                names.append(_format_session_id_value(sid))
+                continue
+        names.append(_CYAN_TMPL % display_id)
+    return ", ".join(names)
+
+
+def _format_channel_list(items: list[dict]) -> str:
+    """Show channel names: all, repo:foo, machine:bar, ..."""
+    return _CYAN_TMPL % ", ".join([item.get("channel", "?") for item in items])
+
+
 def _format_list(items: list) -> str:
     """Format a list result, showing actual names."""
-    n = len(items)
-    if n == 0:
-        return f"{_DIM}empty{_RESET}"
+    if not items:
+        return _EMPTY
     # Infer type from first item's keys and show names
-    first = items[0] if isinstance(items[0], dict) else None
-    if first:
+    first = items[0]
+    if isinstance(first, dict):
         if "session_id" in first:
-            # Show session display_ids (human-readable names): tender-hawk, brave-tiger, ...
-            # Prefer display_id if available, look it up if not, format UUID as fallback
-            names = []
-            for item in items:
-                display_id = item.get("display_id")
-                if display_id:
-                    names.append(f"{_CYAN}{display_id}{_RESET}")
-                else:
-                    # Try to look up the display_id from session_id
-                    sid = item.get("session_id", "?")
-                    resolved = _lookup_session_display_id(sid) if sid != "?" else None
-                    if resolved:
-                        names.append(f"{_CYAN}{resolved}{_RESET}")
-                    else:
-                        # Format the ID (dim truncated UUID)
-                        names.append(_format_session_id_value(sid))
-            return ", ".join(names)
+            return _format_session_list(items)
         if "channel" in first and "subscribers" in first:
-            # Show channel names: all, repo:foo, machine:bar, ...
-            names = [item.get("channel", "?") for item in items]
-            return f"{_CYAN}{', '.join(names)}{_RESET}"
-    return f"{_CYAN}{n} items{_RESET}"
+            return _format_channel_list(items)
+    return f"{_CYAN}{len(items)} items{_RESET}"
 
 
 def _format_result(result) -> str:
@@ -188,8 +287,8 @@ def _format_result(result) -> str:
             text = content_list[0].get("text", "")
             if text:
                 try:
-                    result = json.loads(text)
-                except json.JSONDecodeError:
+                    result = json_compat.loads(text)
+                except ValueError:
                     pass  # Fall through to use result as-is
 
     if not isinstance(result, dict):
@@ -215,62 +314,66 @@ def _format_result(result) -> str:
 
         extra_info = []
 
-        # Show unique publishers with display names
-        # Inactive sessions are shown in red, active in cyan
         if count > 0:
-            # Get active session mapping: session_id → display_id
-            active_sessions = _get_active_sessions_map()
-
-            # Collect unique publishers and resolve to display_ids
-            publisher_display_ids: dict[str, bool] = {}  # display_id → is_active
+            # Get active session mapping: session_id → display_id. Lookups used
+            # once per event are bound to locals ahead of the loop
+            lookup_display_id = _get_active_sessions_map().get
+            is_human_readable = _HUMAN_READABLE_ID.match
+
+            # One pass: collect unique publishers (display_id → is_active) and the
+            # oldest/newest timestamps (ISO-8601 strings compare chronologically)
+            publisher_display_ids: dict[str, bool] = {}
+            seen_sids: set[str] = set()
+            mark_seen = seen_sids.add
+            oldest = newest = None
             for e in events:
                 sid = e.get("session_id", "")
-                if sid and sid != "anonymous":
-                    if sid in active_sessions:
+                if sid and sid != "anonymous" and sid not in seen_sids:
+                    mark_seen(sid)
+                    display_id = lookup_display_id(sid)
+                    if display_id:
                         # Active session - use its display_id
-                        display_id = active_sessions[sid]
                         publisher_display_ids[display_id] = True
-                    else:
-                        # Inactive session - try to resolve display_id, or use human-readable if already
-                        display_id = _lookup_session_display_id(sid)
-                        if display_id:
-                            publisher_display_ids[display_id] = False
-                        elif _is_human_readable_id(sid):
-                            # Legacy: old-style human-readable ID that's not in our DB
-                            publisher_display_ids[sid] = False
-
+                    elif is_human_readable(sid):
+                        # Inactive: old-style human-readable ID that's no longer active
+                        publisher_display_ids.setdefault(sid, False)
+                ts = e.get("timestamp")
+                if ts and isinstance(ts, str):
+                    if oldest is None or ts < oldest:
+                        oldest = ts
+                    if newest is None or ts > newest:
+                        newest = ts
+
+            # Show unique publishers with display names
+            # Inactive sessions are shown in red, active in cyan
             if publisher_display_ids:
-                # Sort: active first (alphabetically), then inactive (alphabetically)
-                active = sorted(d for d, is_active in publisher_display_ids.items() if is_active)
-                inactive = sorted(
-                    d for d, is_active in publisher_display_ids.items() if not is_active
+                # Sort: active first (alphabetically), then inactive (alphabetically).
+                # Only 5 are shown, so partial-sort rather than sorting every name
+                active = heapq.nsmallest(
+                    5, (d for d, is_active in publisher_display_ids.items() if is_active)
+                )
+                inactive = heapq.nsmallest(
+                    5 - len(active),
+                    (d for d, is_active in publisher_display_ids.items() if not is_active),
+                )
+                sorted_publishers = active + inactive
+                names_str = ", ".join(
+                    [
+                        (_CYAN_TMPL if publisher_display_ids[name] else _RED_TMPL) % name
+                        for name in sorted_publishers
+                    ]
                 )
-                sorted_publishers = (active + inactive)[:5]
-                colored_names = []
-                for name in sorted_publishers:
-                    if publisher_display_ids.get(name, False):
-                        colored_names.append(f"{_CYAN}{name}{_RESET}")
-                    else:
-                        colored_names.append(f"{_RED}{name}{_RESET}")
-                names_str = ", ".join(colored_names)
                 if len(publisher_display_ids) > 5:
                     names_str += f" +{len(publisher_display_ids) - 5}"
                 extra_info.append(f"from: {names_str}")
 
-        # Show timespan if we have events with timestamps
-        # Use min/max to always show oldest→newest regardless of order param
-        if count > 0:
-            try:
-                timestamps = [e.get("timestamp", "") for e in events if e.get("timestamp")]
-                if timestamps:
-                    oldest = min(timestamps)[:16]
-                    newest = max(timestamps)[:16]
-                    if oldest != newest:
-                        extra_info.append(f"{_DIM}{oldest} → {newest}{_RESET}")
-                    elif oldest:
-                        extra_info.append(f"{_DIM}{oldest}{_RESET}")
-            except (KeyError, IndexError, TypeError):
-                pass
+            # Show timespan, always oldest→newest regardless of order param
+            if oldest is not None:
+                oldest, newest = oldest[:16], newest[:16]
+                if oldest != newest:
+                    extra_info.append(_TIMESPAN_TMPL % (oldest, newest))
+                else:
+                    extra_info.append(_DIM_TMPL % oldest)
 
         suffix = f" ({', '.join(extra_info)})" if extra_info else ""
         return f"{color}{count} events{_RESET}, cursor={cursor}{suffix}"
@@ -281,27 +384,116 @@ def _format_result(result) -> str:
     if "channels" in result:
         return f"{_CYAN}{len(result['channels'])} channels{_RESET}"
     if "success" in result:
-        return f"{_GREEN}OK{_RESET}" if result["success"] else f"{_RED}FAILED{_RESET}"
+        return _OK if result["success"] else _FAILED
     if "error" in result:
         return f"{_RED}ERROR:{_RESET} {result['error']}"
 
     # Fallback: show keys
     keys = ", ".join(result.keys()) if result else "{}"
-    return f"{_DIM}{keys}{_RESET}"
+    return _DIM_TMPL % keys
 
 
-def _parse_sse_response(response_text: str) -> dict:
+def _parse_sse_response(response_body: bytes | bytearray) -> dict:
     """Parse SSE format response to extract JSON result."""
-    # SSE format: "event: message\ndata: {...}\n\n"
-    for line in response_text.split("\n"):
-        if line.startswith("data: "):
-            try:
-                return json.loads(line[6:])
-            except json.JSONDecodeError:
-                pass
+    # SSE format: b"event: message\ndata: {...}\n\n" - scan the bytes for data lines
+    # directly rather than decoding and splitting the whole body
+    pos = 0
+    while (start := response_body.find(b"data: ", pos)) != -1:
+        end = response_body.find(b"\n", start)
+        if end == -1:
+            end = len(response_body)
+        pos = end
+        if start and response_body[start - 1] != 0x0A:
+            continue  # "data: " in the middle of a line, not a field
+        try:
+            return json_compat.loads(response_body[start + 6 : end])
+        except ValueError:
+            pass  # Invalid JSON (or UTF-8) - try the next data line
     return {}
 
 
+def _format_call_args(tool_args: dict) -> str:
+    """Format tool arguments for the log line; session_id is shown as the caller prefix."""
+    args_str = _format_args(tool_args, skip="session_id")
+    return _DIM_TMPL % args_str if args_str else ""
+
+
+def _format_sse_result(response_body: bytes | bytearray) -> str:
+    """Parse a captured SSE response and format its result (or error)."""
+    resp_json = _parse_sse_response(response_body)
+    return _format_result(resp_json.get("result", resp_json.get("error", {})))
+
+
+def _parse_tool_call(request_body: bytes | bytearray) -> dict | None:
+    """Parse a JSON-RPC request body, returning it only if it is a tools/call."""
+    try:
+        req_json = json_compat.loads(request_body) if request_body else {}
+    except ValueError as e:
+        logger.debug(f"Skipping malformed MCP request: {e}")
+        return None
+    if isinstance(req_json, dict) and req_json.get("method") == "tools/call":
+        return req_json
+    return None
+
+
+def _peek_tool_call(request_prefix: bytes | bytearray) -> dict | None:
+    """Recover what we can from the start of a request too large to buffer.
+
+    Returns a tools/call request carrying only the tool name ("?" if it isn't in
+    the prefix), or None if the prefix shows some other method.
+    """
+    method = _RPC_METHOD.search(request_prefix)
+    if method is not None and method.group(1) != b"tools/call":
+        return None
+    name = _RPC_TOOL_NAME.search(request_prefix)
+    tool_name = name.group(1).decode("utf-8", errors="replace") if name else "?"
+    return {"method": "tools/call", "params": {"name": tool_name}}
+
+
+class _FirstDataLineBuffer:
+    """Buffers a streamed SSE body only until its first data line is complete.
+
+    Chunks are scanned as they arrive; once the first ``data:`` line has its
+    terminating newline, later chunks are ignored, so memory stays bounded by
+    the size of that line rather than the whole response. If that would take
+    more than ``max_bytes``, the buffer is dropped and ``truncated`` is set.
+    """
+
+    __slots__ = ("body", "complete", "truncated", "_max_bytes", "_data_start", "_scanned")
+
+    def __init__(self, max_bytes: int = MAX_LOG_BODY):
+        self.body = bytearray()
+        self.complete = False
+        self.truncated = False
+        self._max_bytes = max_bytes
+        self._data_start = -1
+        self._scanned = 0  # Bytes already searched (minus overlap for split markers)
+
+    def feed(self, chunk: bytes) -> None:
+        if self.complete or not chunk:
+            return
+        body = self.body
+        if len(body) + len(chunk) > self._max_bytes:
+            # Too big to log usefully - stop capturing and release what we have
+            self.body = bytearray()
+            self.complete = self.truncated = True
+            return
+        body += chunk
+        while self._data_start == -1:
+            pos = body.find(b"data: ", self._scanned)
+            if pos == -1:
+                self._scanned = max(0, len(body) - 5)  # "data: " may straddle chunks
+                return
+            self._scanned = pos + 1
+            if pos == 0 or body[pos - 1] == 0x0A:
+                self._data_start = pos
+                self._scanned = pos + 6
+        if body.find(b"\n", self._scanned) != -1:
+            self.complete = True
+        else:
+            self._scanned = len(body)
+
+
 class TailscaleAuthMiddleware:
     """ASGI middleware that requires Tailscale identity headers.
 
@@ -387,83 +579,90 @@ class RequestLoggingMiddleware:
         path = scope.get("path", "")
         method = scope.get("method", "")
 
-        # Only log MCP POST requests
-        if path != "/mcp" or method != "POST":
+        # Only log MCP POST requests, and only when the log line would be emitted -
+        # otherwise skip body capture, parsing, and session lookups entirely
+        if path != "/mcp" or method != "POST" or not logger.isEnabledFor(logging.INFO):
             await self.app(scope, receive, send)
             return
 
-        # Collect request body
-        body_parts = []
+        # Collect request body. Once it's complete, parse it: only tool calls are
+        # logged, so other traffic (initialize, ping, notifications) skips response capture
+        # The usual single-chunk body is kept as-is; later chunks extend one bytearray.
+        # Bodies over MAX_LOG_BODY stop buffering: the tool name is recovered from the
+        # prefix if possible and the args are logged as truncated.
+        request_body: bytes | bytearray | None = b""
+        request_truncated = False
+        tool_call: dict | None = None
 
         async def receive_wrapper():
+            nonlocal request_body, request_truncated, tool_call
             message = await receive()
-            if message["type"] == "http.request":
-                body_parts.append(message.get("body", b""))
+            if message["type"] == "http.request" and request_body is not None:
+                chunk = message.get("body", b"")
+                if len(request_body) + len(chunk) > MAX_LOG_BODY:
+                    prefix = request_body + chunk[: MAX_LOG_BODY - len(request_body)]
+                    tool_call = _peek_tool_call(prefix)
+                    request_body = None
+                    request_truncated = True
+                    return message
+                if not request_body:
+                    request_body = chunk
+                elif chunk:
+                    if not isinstance(request_body, bytearray):
+                        request_body = bytearray(request_body)
+                    request_body += chunk
+                if not message.get("more_body", False):
+                    tool_call = _parse_tool_call(request_body)
             return message
 
-        # Collect response body
-        response_parts = []
+        # Collect response body - only up to the end of the first data line,
+        # which is all _parse_sse_response reads. Chunks are forwarded untouched.
+        response = _FirstDataLineBuffer()
 
         async def send_wrapper(message):
-            if message["type"] == "http.response.body":
-                response_parts.append(message.get("body", b""))
+            if message["type"] == "http.response.body" and tool_call is not None:
+                response.feed(message.get("body", b""))
             await send(message)
 
         await self.app(scope, receive_wrapper, send_wrapper)
 
         # Log after request completes
-        request_body = b"".join(body_parts)
-        response_body = b"".join(response_parts)
-
-        try:
-            req_json = json.loads(request_body) if request_body else {}
-            req_method = req_json.get("method", "?")
-
-            # Only log tool calls
-            if req_method != "tools/call":
-                return
+        if tool_call is None:
+            return
 
-            req_params = req_json.get("params", {})
-            tool_name = req_params.get("name", "?")
-            tool_args = req_params.get("arguments", {})
-
-            # Extract caller from session_id arg (if present)
-            caller_prefix = ""
-            raw_session_id = tool_args.get("session_id")
-            if raw_session_id and isinstance(raw_session_id, str):
-                # Try to resolve to human-readable display_id
-                display_id = _lookup_session_display_id(raw_session_id)
-                if display_id:
-                    caller_prefix = f"{_CYAN}[{display_id}]{_RESET} "
-                elif _is_human_readable_id(raw_session_id):
-                    # Legacy: already human-readable but not in DB
-                    caller_prefix = f"{_CYAN}[{raw_session_id}]{_RESET} "
-                else:
-                    # UUID we couldn't resolve - show truncated
-                    short_id = raw_session_id[:8] if len(raw_session_id) > 8 else raw_session_id
-                    caller_prefix = f"{_DIM}[{short_id}…]{_RESET} "
-
-            # Format args without session_id (it's shown as caller prefix)
-            args_without_session = {k: v for k, v in tool_args.items() if k != "session_id"}
-            args_str = _format_args(args_without_session)
-
-            # Parse SSE response
-            response_text = response_body.decode("utf-8", errors="replace")
-            resp_json = _parse_sse_response(response_text)
-            result = resp_json.get("result", resp_json.get("error", {}))
-            result_str = _format_result(result)
-
-            # Log one-liner: [caller] tool(args) → result (with colors for tail -f)
-            # Use tool-specific colors: yellow for publish/notify, blue for get_events
-            tool_color = _TOOL_COLORS.get(tool_name, _GREEN)
-            tool_colored = f"{tool_color}{_BOLD}{tool_name}{_RESET}"
-            args_colored = f"{_DIM}{args_str}{_RESET}" if args_str else ""
-            arrow = f"{_DIM}→{_RESET}"
-
-            if args_str:
-                logger.info(f"{caller_prefix}{tool_colored}({args_colored}) {arrow} {result_str}")
+        # Display-name lookups below read the session map; load it off the event loop
+        await _refresh_sessions_map()
+
+        req_params = tool_call.get("params", {})
+        tool_name = req_params.get("name", "?")
+        tool_args = req_params.get("arguments", {})
+
+        # Extract caller from session_id arg (if present)
+        caller_prefix = ""
+        raw_session_id = tool_args.get("session_id")
+        if raw_session_id and isinstance(raw_session_id, str):
+            # Try to resolve to human-readable display_id
+            display_id = _lookup_session_display_id(raw_session_id)
+            if display_id:
+                caller_prefix = _CALLER_TMPL % display_id
+            elif _is_human_readable_id(raw_session_id):
+                # Legacy: already human-readable but not in DB
+                caller_prefix = _CALLER_TMPL % raw_session_id
             else:
-                logger.info(f"{caller_prefix}{tool_colored}() {arrow} {result_str}")
-
-        except (json.JSONDecodeError, UnicodeDecodeError) as e:
-            logger.debug(f"Skipping malformed MCP request: {e}")
+                # UUID we couldn't resolve - show truncated
+                short_id = raw_session_id[:8] if len(raw_session_id) > 8 else raw_session_id
+                caller_prefix = _UNRESOLVED_CALLER_TMPL % short_id
+
+        # Log one-liner: [caller] tool(args) → result (with colors for tail -f).
+        # Formatted eagerly: the INFO gate above already applies, and QueueHandler renders
+        # the record synchronously anyway
+        args_str = _TRUNCATED if request_truncated else _format_call_args(tool_args)
+        result_str = _TRUNCATED if response.truncated else _format_sse_result(response.body)
+        logger.info(
+            "%s%s(%s) %s %s",
+            caller_prefix,
+            _colored_tool_name(str(tool_name)),
+            args_str,
+            _ARROW,
+            result_str,
+        )
@@ -9,25 +9,44 @@ Provides tools for cross-session Claude Code communication:
 - notify: Send system notifications
 """
 
+import atexit
+import concurrent.futures
 import logging
+import logging.handlers
 import os
+import re
 import socket
+import time
 import uuid
-from datetime import datetime
+from collections.abc import Iterable
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Literal
 
 from fastmcp import FastMCP
 
+from agent_event_bus.background import (
+    EventBatcher,
+    NotificationQueue,
+    PeriodicTask,
+    SessionWriteQueue,
+    start_log_listener,
+)
 from agent_event_bus.helpers import (
+    DEV_MODE,
     _dev_notify,
     extract_repo_from_cwd,
+    forget_client_liveness,
     is_client_alive,
     send_notification,
 )
-from agent_event_bus.middleware import RequestLoggingMiddleware, TailscaleAuthMiddleware
+from agent_event_bus.middleware import (
+    RequestLoggingMiddleware,
+    TailscaleAuthMiddleware,
+    invalidate_sessions_map,
+)
 from agent_event_bus.session_ids import generate_session_id
-from agent_event_bus.storage import Session, SQLiteStorage
+from agent_event_bus.storage import Event, Session, SQLiteStorage
 
 # Configure logging
 # Always log to ~/.claude/contrib/agent-event-bus/agent-event-bus.log for tail -f access
@@ -36,7 +55,7 @@ from agent_event_bus.storage import Session, SQLiteStorage
 LOG_FILE = Path.home() / ".claude" / "contrib" / "agent-event-bus" / "agent-event-bus.log"
 
 logger = logging.getLogger("agent-event-bus")
-logger.setLevel(logging.DEBUG if os.environ.get("DEV_MODE") else logging.INFO)
+logger.setLevel(logging.DEBUG if DEV_MODE else logging.INFO)
 
 # File handler - skip during tests, guard against reimport duplication
 # Check both PYTEST_CURRENT_TEST (set per-test) and AGENT_EVENT_BUS_TESTING (set in conftest.py)
@@ -52,7 +71,7 @@ if (
     logger.addHandler(file_handler)
 
     # Console handler - only in dev mode
-    if os.environ.get("DEV_MODE"):
+    if DEV_MODE:
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.DEBUG)
         console_handler.setFormatter(
@@ -62,6 +81,25 @@ if (
 
 # Constants
 MAX_PAYLOAD_PREVIEW = 50  # Max chars to show in notification previews
+# Hard cap on stored payload size; longer payloads are truncated on publish
+MAX_PAYLOAD_CHARS = int(os.environ.get("AGENT_EVENT_BUS_MAX_PAYLOAD", "1000000"))
+HEARTBEAT_DEBOUNCE = timedelta(seconds=5)  # Min interval between persisted heartbeats
+PUBLISH_BATCH_TIMEOUT = 0.05  # Seconds to wait on the event batcher before inserting directly
+STALE_CLEANUP_INTERVAL = 30.0  # Seconds between stale-session sweeps (each takes a write lock)
+LIVE_SESSIONS_TTL = 1.5  # Seconds to reuse a liveness sweep across calls
+LOCAL_HOSTNAME = socket.gethostname()
+# Default cwd for registrations that don't pass one (the server's own directory)
+DEFAULT_CWD = os.environ.get("PWD") or os.getcwd()
+
+# Adaptive polling hint returned by get_events (exponential backoff on empty polls)
+POLL_INTERVAL_MIN_MS = 100
+POLL_INTERVAL_MAX_MS = 5000
+POLL_BACKOFF_FACTOR = 1.5
+
+GUIDE_PATH = Path(__file__).parent / "guide.md"
+
+# Known channel types published with an empty value, e.g. "session:"
+_EMPTY_TYPED_CHANNEL = re.compile(r"(session|repo|machine):\Z")
 
 # Initialize MCP server
 mcp = FastMCP("agent-event-bus")
@@ -69,34 +107,180 @@ mcp = FastMCP("agent-event-bus")
 # SQLite-backed storage (persists across restarts)
 storage = SQLiteStorage()
 
+# Usage guide contents as (mtime_ns, text), refreshed when guide.md changes
+_guide_cache: tuple[int, str] | None = None
+
+# Last heartbeat written to storage per session (debounces writes from polling)
+_last_persisted_heartbeat: dict[str, datetime] = {}
+
+# Monotonic time of the last stale-session sweep (0.0 = never, sweep on next call)
+_last_stale_cleanup = 0.0
+
+# Last liveness sweep as (monotonic timestamp, sessions); None forces a re-sweep
+_live_sessions_cache: tuple[float, list[Session]] | None = None
+
+# Last cursor high-water mark persisted per session (skips non-advancing writes)
+_last_cursor_write: dict[str, int] = {}
+
+# Consecutive empty polls per session (drives suggested_next_poll_ms)
+_empty_poll_streak: dict[str, int] = {}
+
+# Write-behind queue for heartbeat/cursor updates, started by create_app().
+# When None (tests, direct calls), writes go straight to storage.
+_session_writer: SessionWriteQueue | None = None
+
+# Coalesces publish_event inserts into shared transactions, started by create_app().
+# When None, publish_event inserts directly.
+_event_batcher: EventBatcher | None = None
+
+# Delivers DM notifications off the request path, started by create_app().
+# When None, notifications are sent inline.
+_notifier: NotificationQueue | None = None
+
+# Writes log records to the file/console handlers off the request path, started
+# by create_app(). When None, handlers write inline.
+_log_listener: logging.handlers.QueueListener | None = None
+
+# Sweeps stale sessions every STALE_CLEANUP_INTERVAL, started by create_app().
+# When None, tools sweep inline via _maybe_cleanup_stale_sessions().
+_stale_sweeper: PeriodicTask | None = None
+
 
 @mcp.resource("agent-event-bus://guide", description="Usage guide and best practices")
 def usage_guide() -> str:
-    """Return the event bus usage guide from external markdown file."""
-    guide_path = Path(__file__).parent / "guide.md"
+    """Return the event bus usage guide from external markdown file.
+
+    The contents are cached and only re-read when the file's mtime changes.
+    """
+    global _guide_cache
     try:
-        return guide_path.read_text()
+        mtime = GUIDE_PATH.stat().st_mtime_ns
+        if _guide_cache is None or _guide_cache[0] != mtime:
+            _guide_cache = (mtime, GUIDE_PATH.read_text())
+        return _guide_cache[1]
     except FileNotFoundError:
         return "# Event Bus Usage Guide\n\nGuide file not found. See CLAUDE.md for usage."
 
 
 def _auto_heartbeat(session_id: str | None) -> None:
-    """Refresh heartbeat for a session if it exists."""
-    if session_id and session_id != "anonymous":
-        storage.update_heartbeat(session_id, datetime.now())
+    """Refresh heartbeat for a session if it exists.
+
+    Writes are debounced per session: a session polling in a tight loop only
+    touches SQLite once per HEARTBEAT_DEBOUNCE. The 24-hour session timeout
+    makes a few seconds of staleness irrelevant. Unregistered session IDs are
+    skipped without a debounce entry, since nothing would ever remove it.
+    """
+    if not session_id or session_id == "anonymous":
+        return
+
+    now = datetime.now()
+    last = _last_persisted_heartbeat.get(session_id)
+    if last is not None:
+        if now - last < HEARTBEAT_DEBOUNCE:
+            return
+    elif not storage.session_exists(session_id):
+        return
+
+    # Cached session lists are left alone: their heartbeat order may lag by up to
+    # LIVE_SESSIONS_TTL, and the write is queued anyway, so a reload wouldn't see it yet
+    _last_persisted_heartbeat[session_id] = now
+    if _session_writer is not None:
+        _session_writer.put_heartbeat(session_id, now)
+    else:
+        storage.update_heartbeat(session_id, now)
+
+
+def _preview(text: str, limit: int = MAX_PAYLOAD_PREVIEW) -> str:
+    """Shorten text for notifications and logs, marking truncation with '...'."""
+    return text if len(text) <= limit else f"{text[:limit]}..."
+
+
+def _suggest_next_poll_ms(session_id: str | None, got_events: bool) -> int:
+    """Suggest how long a poller should wait before calling get_events again.
+
+    Backs off exponentially while a session keeps seeing empty polls and resets
+    as soon as events arrive. Anonymous pollers and unregistered session IDs
+    have no streak to track (it would never be cleaned up), so they always get
+    the base interval.
+    """
+    if not session_id or got_events:
+        if session_id:
+            _empty_poll_streak.pop(session_id, None)
+        return POLL_INTERVAL_MIN_MS
+
+    streak = _empty_poll_streak.get(session_id)
+    if streak is None and not storage.session_exists(session_id):
+        return POLL_INTERVAL_MIN_MS
+    streak = (streak or 0) + 1
+    _empty_poll_streak[session_id] = streak
+    return int(min(POLL_INTERVAL_MIN_MS * POLL_BACKOFF_FACTOR**streak, POLL_INTERVAL_MAX_MS))
+
+
+def _resume_cursor(session_id: str, saved_cursor: str | None) -> str | None:
+    """Pick where a resuming session continues from.
+
+    Cursor marks reach storage through the write-behind queue, so the saved
+    cursor can lag the last mark handed out by this process. Use whichever is
+    newer, so a resume right after a poll doesn't replay events.
+    """
+    mark = _last_cursor_write.get(session_id)
+    if mark is None:
+        return saved_cursor
+    try:
+        if saved_cursor and int(saved_cursor) >= mark:
+            return saved_cursor
+    except ValueError:
+        pass  # Malformed saved cursor - the in-memory mark wins
+    return str(mark)
 
 
 def _get_session_channels(session: Session) -> list[str]:
     """Compute implicit channel subscriptions for a session.
 
-    Sessions are auto-subscribed to channels based on their attributes.
+    Sessions are auto-subscribed to channels based on their attributes
+    (see Session.channels, which caches them per instance).
     """
-    return [
-        "all",  # Broadcasts
-        f"session:{session.id}",  # Direct messages to this session
-        f"repo:{session.repo}",  # Same repo
-        f"machine:{session.machine}",  # Same machine
-    ]
+    return list(session.channels)
+
+
+def _maybe_cleanup_stale_sessions() -> None:
+    """Soft-delete stale sessions at most once per STALE_CLEANUP_INTERVAL.
+
+    Sessions time out after 24 hours, so sweeping every 30 seconds instead of
+    on every RPC changes nothing observable while sparing each call a write lock.
+    A no-op when the background sweeper is running.
+    """
+    global _last_stale_cleanup
+    if _stale_sweeper is not None:
+        return
+    now = time.monotonic()
+    if _last_stale_cleanup and now - _last_stale_cleanup < STALE_CLEANUP_INTERVAL:
+        return
+    _last_stale_cleanup = now
+    _sweep_stale_sessions()
+
+
+def _sweep_stale_sessions() -> None:
+    """Soft-delete stale sessions, dropping their in-memory state and cached session lists."""
+    stale_ids = storage.cleanup_stale_sessions()
+    if stale_ids:
+        _forget_sessions(stale_ids)
+        _invalidate_live_sessions()
+
+
+def _forget_sessions(session_ids: Iterable[str]) -> None:
+    """Drop per-session bookkeeping (heartbeat debounce, cursor mark, poll streak)."""
+    for session_id in session_ids:
+        _last_persisted_heartbeat.pop(session_id, None)
+        _last_cursor_write.pop(session_id, None)
+        _empty_poll_streak.pop(session_id, None)
+
+
+def _invalidate_live_sessions() -> None:
+    """Drop cached session lists (liveness sweep, log display names) so they reload."""
+    global _live_sessions_cache
+    _live_sessions_cache = None
+    invalidate_sessions_map()
 
 
 def _get_live_sessions() -> list[Session]:
@@ -105,21 +289,37 @@ def _get_live_sessions() -> list[Session]:
     For local sessions, checks if the client process is still alive.
     Remote sessions and sessions without client_id are assumed alive.
 
+    The sweep costs a liveness syscall per session, so results are reused for
+    LIVE_SESSIONS_TTL seconds. Register/unregister invalidate the cache.
+
     Returns:
         List of sessions that are still alive
     """
-    storage.cleanup_stale_sessions()
-    local_hostname = socket.gethostname()
+    global _live_sessions_cache
+    if _live_sessions_cache is not None:
+        swept_at, cached = _live_sessions_cache
+        if time.monotonic() - swept_at < LIVE_SESSIONS_TTL:
+            return list(cached)
+
+    _maybe_cleanup_stale_sessions()
     live = []
+    dead_ids = []
 
     for s in storage.list_sessions():
-        is_local = s.machine == local_hostname
+        is_local = s.machine == LOCAL_HOSTNAME
         if not is_client_alive(s.client_id, is_local):
-            storage.delete_session(s.id)
+            dead_ids.append(s.id)
+            forget_client_liveness(s.client_id)
             continue
         live.append(s)
 
-    return live
+    # Soft-delete crashed local sessions in one transaction
+    if dead_ids:
+        storage.delete_sessions(dead_ids)
+        _forget_sessions(dead_ids)
+
+    _live_sessions_cache = (time.monotonic(), live)
+    return list(live)
 
 
 def _notify_dm_recipient(
@@ -145,29 +345,29 @@ def _notify_dm_recipient(
         return  # Invalid format, silently skip
 
     target_id = parts[1]
-    target_session = storage.get_session(target_id)
+    # Look up target and sender together (one query instead of two)
+    lookup_ids = [target_id, sender_session_id] if sender_session_id else [target_id]
+    sessions = storage.get_sessions_by_ids(lookup_ids)
 
+    target_session = sessions.get(target_id)
     if not target_session:
         return  # Session not found, silently skip
 
     # Get sender info for notification context
-    sender_name = "anonymous"
-    if sender_session_id:
-        sender_session = storage.get_session(sender_session_id)
-        if sender_session:
-            sender_name = sender_session.name
-        # If sender not found, keep "anonymous" - don't log (normal during tests/cleanup)
+    # If sender not found, keep "anonymous" - don't log (normal during tests/cleanup)
+    sender_session = sessions.get(sender_session_id) if sender_session_id else None
+    sender_name = sender_session.name if sender_session else "anonymous"
 
     # Send notification to alert the human
-    payload_preview = (
-        payload[:MAX_PAYLOAD_PREVIEW] + "..." if len(payload) > MAX_PAYLOAD_PREVIEW else payload
-    )
+    payload_preview = _preview(payload)
     try:
         project_name = target_session.get_project_name()
-        send_notification(
-            title=f"📨 {target_session.name} • {project_name}",
-            message=f"From: {sender_name}\n{payload_preview}",
-        )
+        title = f"📨 {target_session.name} • {project_name}"
+        message = f"From: {sender_name}\n{payload_preview}"
+        if _notifier is not None:
+            _notifier.put(title, message)
+        else:
+            send_notification(title=title, message=message)
     except Exception as e:
         # Notification failure is non-critical, but log for debugging
         logger.warning(f"Failed to notify session {target_id} of DM: {e}")
@@ -188,11 +388,11 @@ def register_session(
         cwd: Defaults to $PWD
         client_id: Enables session resumption via (machine, client_id)
     """
-    storage.cleanup_stale_sessions()
+    _maybe_cleanup_stale_sessions()
 
     now = datetime.now()
-    machine = machine or socket.gethostname()
-    cwd = cwd or os.environ.get("PWD", os.getcwd())
+    machine = machine or LOCAL_HOSTNAME
+    cwd = cwd or DEFAULT_CWD
     repo = extract_repo_from_cwd(cwd)
 
     # Check for existing session with same machine+client_id
@@ -205,11 +405,13 @@ def register_session(
         existing.name = name
         existing.last_heartbeat = now
         storage.add_session(existing)  # INSERT OR REPLACE
-        _dev_notify("register_session", f"{name} resumed → {existing.display_id}")
+        _invalidate_live_sessions()
+        if DEV_MODE:
+            _dev_notify("register_session", f"{name} resumed → {existing.display_id}")
 
         # Use session's last_cursor if available (resume where they left off)
         # Otherwise fall back to current position
-        resume_cursor = existing.last_cursor or storage.get_cursor()
+        resume_cursor = _resume_cursor(existing.id, existing.last_cursor) or storage.get_cursor()
         return {
             "session_id": existing.id,
             "display_id": existing.display_id,
@@ -241,6 +443,7 @@ def register_session(
         client_id=client_id,
     )
     storage.add_session(session)
+    _invalidate_live_sessions()
 
     # Auto-publish registration event and capture its ID directly
     # (avoids race condition if another event is published between add and get)
@@ -248,6 +451,7 @@ def register_session(
         event_type="session_registered",
         payload=f"{name} started on {machine} in {cwd}",
         session_id=session_id,
+        timestamp=now,
     )
 
     result = {
@@ -262,7 +466,8 @@ def register_session(
         "resumed": False,
         "tip": f"You are '{name}' ({display_id}). Use cursor to start polling: get_events(cursor=cursor).",
     }
-    _dev_notify("register_session", f"{name} → {display_id}")
+    if DEV_MODE:
+        _dev_notify("register_session", f"{name} → {display_id}")
     return result
 
 
@@ -270,6 +475,7 @@ def register_session(
 def list_sessions() -> list[dict]:
     """List active sessions, ordered by most recently active."""
     results = []
+    now = datetime.now()  # One clock read for every row's age
 
     for s in _get_live_sessions():
         results.append(
@@ -283,33 +489,56 @@ def list_sessions() -> list[dict]:
                 "client_id": s.client_id,
                 "registered_at": s.registered_at.isoformat(),
                 "last_heartbeat": s.last_heartbeat.isoformat(),
-                "age_seconds": (datetime.now() - s.registered_at).total_seconds(),
+                "age_seconds": (now - s.registered_at).total_seconds(),
                 "subscribed_channels": _get_session_channels(s),
             }
         )
 
-    _dev_notify("list_sessions", f"{len(results)} active")
+    if DEV_MODE:
+        _dev_notify("list_sessions", f"{len(results)} active")
     return results
 
 
 @mcp.tool()
 def list_channels() -> list[dict]:
     """List channels with subscriber counts."""
-    channel_subscribers: dict[str, int] = {}
-
-    for s in _get_live_sessions():
-        for ch in _get_session_channels(s):
-            channel_subscribers[ch] = channel_subscribers.get(ch, 0) + 1
+    # Prune dead sessions first, then let SQLite do the per-channel counting
+    _get_live_sessions()
 
-    # Build result - only channels with >0 subscribers (all of them at this point)
+    # Only channels with >0 subscribers come back from the GROUP BY
     results = [
-        {"channel": ch, "subscribers": count} for ch, count in sorted(channel_subscribers.items())
+        {"channel": ch, "subscribers": count} for ch, count in storage.channel_subscriber_counts()
     ]
 
-    _dev_notify("list_channels", f"{len(results)} active channels")
+    if DEV_MODE:
+        _dev_notify("list_channels", f"{len(results)} active channels")
     return results
 
 
+def _store_event(event_type: str, payload: str, session_id: str, channel: str) -> Event:
+    """Insert an event, via the batcher when it is running.
+
+    If the batcher hasn't picked the event up within PUBLISH_BATCH_TIMEOUT, the
+    submission is cancelled and the event is inserted directly instead.
+    """
+    if _event_batcher is None:
+        return storage.add_event(
+            event_type=event_type, payload=payload, session_id=session_id, channel=channel
+        )
+
+    future = _event_batcher.submit(event_type, payload, session_id, channel)
+    try:
+        return future.result(timeout=PUBLISH_BATCH_TIMEOUT)
+    except concurrent.futures.TimeoutError:
+        if future.cancel():
+            logger.debug("Event batcher behind, inserting directly")
+            return storage.add_event(
+                event_type=event_type, payload=payload, session_id=session_id, channel=channel
+            )
+        # Already being written - its transaction is in flight, so wait for it
+        return future.result()
+
+
 @mcp.tool()
 def publish_event(
     event_type: str,
@@ -328,30 +557,27 @@ def publish_event(
     # Auto-refresh heartbeat when session publishes
     _auto_heartbeat(session_id)
 
-    # Validate channel format for known channel types
-    if channel not in ["all"] and ":" in channel:
-        channel_type, _, channel_value = channel.partition(":")
-        if channel_type in ["session", "repo", "machine"]:
-            if not channel_value:
-                logger.warning(
-                    f"Invalid {channel_type} channel format: '{channel}'. "
-                    f"Expected '{channel_type}:<value>'"
-                )
+    # Validate channel format for known channel types (one precompiled match per publish)
+    invalid = _EMPTY_TYPED_CHANNEL.match(channel)
+    if invalid:
+        channel_type = invalid.group(1)
+        logger.warning(
+            f"Invalid {channel_type} channel format: '{channel}'. Expected '{channel_type}:<value>'"
+        )
+
+    if len(payload) > MAX_PAYLOAD_CHARS:
+        logger.warning(
+            f"Truncating {event_type} payload from {len(payload)} to {MAX_PAYLOAD_CHARS} chars"
+        )
+        payload = payload[:MAX_PAYLOAD_CHARS]
 
     # Auto-notify on direct messages (DMs)
     _notify_dm_recipient(channel, payload, session_id)
 
-    event = storage.add_event(
-        event_type=event_type,
-        payload=payload,
-        session_id=session_id or "anonymous",
-        channel=channel,
-    )
+    event = _store_event(event_type, payload, session_id or "anonymous", channel)
 
-    truncated = (
-        payload[:MAX_PAYLOAD_PREVIEW] + "..." if len(payload) > MAX_PAYLOAD_PREVIEW else payload
-    )
-    _dev_notify("publish_event", f"{event_type} [{channel}] {truncated}")
+    if DEV_MODE:
+        _dev_notify("publish_event", f"{event_type} [{channel}] {_preview(payload)}")
 
     return {
         "event_id": event.id,
@@ -382,7 +608,7 @@ def get_events(
     resume: bool = False,
     event_types: list[str] | None = None,
 ) -> dict:
-    """Get events. Auto-refreshes heartbeat. Returns events list and next_cursor for pagination.
+    """Get events. Auto-refreshes heartbeat. Returns events, next_cursor, and suggested_next_poll_ms.
 
     Args:
         cursor: Position from register_session or previous call
@@ -399,11 +625,9 @@ def get_events(
     # Resume from saved cursor if requested
     # Only applies when: resume=True, session_id provided, cursor not provided
     if resume and session_id and cursor is None:
-        session = storage.get_session(session_id)
-        if session and session.last_cursor:
-            cursor = session.last_cursor
+        cursor = _resume_cursor(session_id, storage.get_session_cursor(session_id) or None)
 
-    storage.cleanup_stale_sessions()
+    _maybe_cleanup_stale_sessions()
 
     # Determine channel filtering:
     # - If explicit channel provided, filter to that channel
@@ -413,7 +637,7 @@ def get_events(
     else:
         channels = _get_implicit_channels(session_id)
 
-    raw_events, next_cursor = storage.get_events(
+    events, next_cursor = storage.get_events_raw(
         cursor=cursor, limit=limit, channels=channels, order=order, event_types=event_types
     )
 
@@ -423,28 +647,31 @@ def get_events(
     # what order was used for polling.
     # Note: Updates on any poll - any poll means the session has "seen" events up to this point.
     # Silently ignore unknown session_ids - callers may pass external session IDs
-    # (like Claude Code's own UUIDs) that aren't registered with us.
-    if session_id and raw_events:
-        high_water_mark = str(max(e.id for e in raw_events))
-        storage.update_session_cursor(session_id, high_water_mark)
-
-    events = [
-        {
-            "id": e.id,
-            "event_type": e.event_type,
-            "payload": e.payload,
-            "session_id": e.session_id,
-            "timestamp": e.timestamp.isoformat(),
-            "channel": e.channel,
-        }
-        for e in raw_events
-    ]
+    # (like Claude Code's own UUIDs) that aren't registered with us. They get no
+    # in-memory mark either, since nothing would ever remove it.
+    # Results are sorted by id, so the newest event is at the front (desc) or back (asc).
+    # Writes that wouldn't advance the last persisted mark are skipped.
+    if session_id and events:
+        high_water_mark = events[0]["id"] if order == "desc" else events[-1]["id"]
+        last_mark = _last_cursor_write.get(session_id)
+        if last_mark is None:
+            advance = storage.session_exists(session_id)
+        else:
+            advance = high_water_mark > last_mark
+        if advance:
+            _last_cursor_write[session_id] = high_water_mark
+            if _session_writer is not None:
+                _session_writer.put_cursor(session_id, str(high_water_mark))
+            else:
+                storage.update_session_cursor(session_id, str(high_water_mark))
 
-    _dev_notify("get_events", f"{len(events)} events (cursor={cursor})")
+    if DEV_MODE:
+        _dev_notify("get_events", f"{len(events)} events (cursor={cursor})")
 
     return {
         "events": events,
         "next_cursor": next_cursor,
+        "suggested_next_poll_ms": _suggest_next_poll_ms(session_id, bool(events)),
     }
 
 
@@ -458,23 +685,29 @@ def unregister_session(session_id: str | None = None, client_id: str | None = No
     """
     # Look up session by client_id if provided
     if client_id and not session_id:
-        machine = socket.gethostname()
+        machine = LOCAL_HOSTNAME
         session = storage.find_session_by_client(machine, client_id)
         if session:
             session_id = session.id
         else:
-            _dev_notify("unregister_session", f"client_id {client_id} not found")
+            if DEV_MODE:
+                _dev_notify("unregister_session", f"client_id {client_id} not found")
             return {"error": "Session not found", "client_id": client_id, "machine": machine}
     elif not session_id:
-        _dev_notify("unregister_session", "no identifier provided")
+        if DEV_MODE:
+            _dev_notify("unregister_session", "no identifier provided")
         return {"error": "Must provide either session_id or client_id"}
 
     session = storage.get_session(session_id)
     if not session:
-        _dev_notify("unregister_session", f"{session_id} not found")
+        if DEV_MODE:
+            _dev_notify("unregister_session", f"{session_id} not found")
         return {"error": "Session not found", "session_id": session_id}
 
     storage.delete_session(session_id)
+    _invalidate_live_sessions()
+    forget_client_liveness(session.client_id)
+    _forget_sessions([session_id])
 
     # Publish unregister event
     storage.add_event(
@@ -483,7 +716,8 @@ def unregister_session(session_id: str | None = None, client_id: str | None = No
         session_id=session_id,
     )
 
-    _dev_notify("unregister_session", f"{session.name} ({session.display_id})")
+    if DEV_MODE:
+        _dev_notify("unregister_session", f"{session.name} ({session.display_id})")
     return {
         "success": True,
         "session_id": session_id,
@@ -520,7 +754,38 @@ def create_app():
     Use `tail -f ~/.claude/contrib/agent-event-bus/agent-event-bus.log` to watch activity.
 
     Set AGENT_EVENT_BUS_AUTH_DISABLED=1 to disable auth (for testing/local dev).
+
+    Also starts the background workers that move heartbeat/cursor updates,
+    DM notifications, log writes, and stale-session sweeps off the request
+    path and batch publish_event inserts.
     """
+    global _session_writer, _event_batcher, _notifier, _log_listener, _stale_sweeper
+    if _log_listener is None:
+        _log_listener = start_log_listener(logger)
+        if _log_listener is not None:
+            atexit.register(_log_listener.stop)
+
+    logger.info(f"SQLite journal mode: {storage.journal_mode}")
+
+    if _session_writer is None:
+        _session_writer = SessionWriteQueue(storage)
+        _session_writer.start()
+        atexit.register(_session_writer.stop)
+    if _event_batcher is None:
+        _event_batcher = EventBatcher(storage)
+        _event_batcher.start()
+        atexit.register(_event_batcher.stop)
+    if _notifier is None:
+        _notifier = NotificationQueue(send_notification)
+        _notifier.start()
+        atexit.register(_notifier.stop)
+    if _stale_sweeper is None:
+        _stale_sweeper = PeriodicTask(
+            _sweep_stale_sessions, STALE_CLEANUP_INTERVAL, name="stale-sweeper"
+        )
+        _stale_sweeper.start()
+        atexit.register(_stale_sweeper.stop)
+
     # stateless_http=True allows resilience to server restarts
     app = mcp.http_app(stateless_http=True)
 
@@ -4,7 +4,7 @@ import random
 
 # Word lists for human-readable session IDs
 # ~50 adjectives x ~50 animals = ~2500 unique combinations
-ADJECTIVES = [
+ADJECTIVES = (
     "brave",
     "calm",
     "clever",
@@ -55,9 +55,9 @@ ADJECTIVES = [
     "azure",
     "coral",
     "rustic",
-]
+)
 
-ANIMALS = [
+ANIMALS = (
     "badger",
     "cat",
     "dog",
@@ -108,9 +108,15 @@ ANIMALS = [
     "raven",
     "sloth",
     "toucan",
-]
+)
+
+
+_NUM_ANIMALS = len(ANIMALS)
+_NUM_COMBINATIONS = len(ADJECTIVES) * _NUM_ANIMALS
 
 
 def generate_session_id() -> str:
     """Generate a human-readable session ID like 'brave-tiger'."""
-    return f"{random.choice(ADJECTIVES)}-{random.choice(ANIMALS)}"
+    # One PRNG draw over the full product instead of two random.choice calls
+    adj_index, animal_index = divmod(random.randrange(_NUM_COMBINATIONS), _NUM_ANIMALS)
+    return f"{ADJECTIVES[adj_index]}-{ANIMALS[animal_index]}"
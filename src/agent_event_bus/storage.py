@@ -4,18 +4,22 @@ import logging
 import os
 import shutil
 import sqlite3
-from collections.abc import Callable
+import threading
+from collections.abc import Callable, Iterable
 from contextlib import contextmanager
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import Literal
 
+from agent_event_bus.helpers import _sanitize_name
+
 logger = logging.getLogger("agent-event-bus")
 
 # Schema version for migrations
 # Increment this when adding new migrations
-SCHEMA_VERSION = 2
+SCHEMA_VERSION = 3
 
 # Migration function type: takes a connection, returns nothing
 MigrationFunc = Callable[[sqlite3.Connection], None]
@@ -100,6 +104,21 @@ def migrate_v2(conn: sqlite3.Connection) -> None:
     # SQLite doesn't support ALTER COLUMN, so we'll enforce in application
 
 
+@migration(3, "active_sessions_index")
+def migrate_v3(conn: sqlite3.Connection) -> None:
+    """Index active sessions by heartbeat.
+
+    Soft-deleted rows are never purged, so list_sessions() and the stale sweep
+    (both "deleted_at IS NULL" plus last_heartbeat) would otherwise walk every
+    session ever registered. The partial index only holds active sessions.
+    Lives in a migration because deleted_at only exists once v2 has run.
+    """
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sessions_active
+        ON sessions(last_heartbeat) WHERE deleted_at IS NULL
+    """)
+
+
 # Register datetime adapters/converters (required for Python 3.12+)
 # See: https://docs.python.org/3/library/sqlite3.html#default-adapters-and-converters-deprecated
 
@@ -134,6 +153,20 @@ class Session:
     last_cursor: str | None = None  # Last seen event cursor for this session
     deleted_at: datetime | None = None  # Soft-delete timestamp (None = active)
 
+    @cached_property
+    def channels(self) -> tuple[str, ...]:
+        """Implicit channel subscriptions, derived from id/repo/machine.
+
+        Computed once per instance; those fields don't change after registration.
+        Keep in sync with SQLiteStorage.channel_subscriber_counts().
+        """
+        return (
+            "all",  # Broadcasts
+            f"session:{self.id}",  # Direct messages to this session
+            f"repo:{self.repo}",  # Same repo
+            f"machine:{self.machine}",  # Same machine
+        )
+
     def get_project_name(self) -> str:
         """Get the project name, preferring explicit repo over cwd basename.
 
@@ -150,7 +183,7 @@ class Session:
             basename = os.path.basename(self.cwd.rstrip("/"))
             if basename:
                 # Sanitize special chars (defense-in-depth, matches extract_repo_from_cwd)
-                return basename.replace("\n", " ").replace("\t", " ").replace("\r", " ")
+                return _sanitize_name(basename)
 
         return "unknown"
 
@@ -179,6 +212,56 @@ OLD_CONTRIB_DB_PATH = Path.home() / ".claude" / "contrib" / "event-bus" / "data.
 # in list_sessions()
 SESSION_TIMEOUT = 86400  # 24 hours
 
+# Applied to every connection. journal_mode=WAL is persistent and set once in _init_db.
+# synchronous=NORMAL is durable across application crashes in WAL mode (only an OS
+# crash/power loss can drop the last commits), which is fine for a coordination bus.
+# busy_timeout lets a writer wait out a checkpoint or the other writer thread instead
+# of failing with "database is locked" (sqlite3's default wait is 5s).
+CONNECTION_PRAGMAS = (
+    "PRAGMA busy_timeout=30000",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",  # 256 MiB
+    "PRAGMA cache_size=-65536",  # 64 MiB
+)
+
+# Per-connection prepared statement cache (sqlite3 default is 128). Hot queries use
+# constant SQL strings so they are parsed once per connection and reused.
+STATEMENT_CACHE_SIZE = 256
+
+EVENT_COLUMNS = "id, event_type, payload, session_id, timestamp, channel"
+# CAST drops the column's declared type, so the TIMESTAMP converter doesn't run
+EVENT_COLUMNS_RAW = (
+    "id, event_type, payload, session_id, CAST(timestamp AS TEXT) AS timestamp, channel"
+)
+
+INSERT_EVENT_SQL = (
+    "INSERT INTO events (event_type, payload, session_id, timestamp, channel) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+
+
+@lru_cache(maxsize=256)
+def _events_query(
+    columns: str, order: str, has_cursor: bool, num_channels: int, num_types: int
+) -> str:
+    """Build the events SELECT for one query shape.
+
+    Cached so the common polls (e.g. "everything after cursor, newest first")
+    reuse an identical SQL string: no per-call assembly, and sqlite3's
+    statement cache hits every time.
+    """
+    conditions = []
+    if has_cursor:
+        conditions.append("id > ?")
+    if num_channels:
+        conditions.append(f"channel IN ({','.join('?' * num_channels)})")
+    if num_types:
+        conditions.append(f"event_type IN ({','.join('?' * num_types)})")
+    where_clause = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    effective_order = "DESC" if order == "desc" else "ASC"
+    return f"SELECT {columns} FROM events{where_clause} ORDER BY id {effective_order} LIMIT ?"
+
 
 class SQLiteStorage:
     """SQLite-backed storage for sessions and events."""
@@ -196,6 +279,9 @@ class SQLiteStorage:
 
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
+        # One long-lived connection per thread, so statement caches survive between calls
+        self._local = threading.local()
+
         self._init_db()
 
     def _migrate_db_location(self) -> None:
@@ -222,17 +308,35 @@ class SQLiteStorage:
 
     @contextmanager
     def _connect(self):
-        """Context manager for database connections."""
-        conn = sqlite3.connect(
-            self.db_path,
-            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
-        )
-        conn.row_factory = sqlite3.Row
+        """Context manager yielding this thread's database connection.
+
+        The connection stays open between calls so sqlite3 can reuse prepared
+        statements. Each block commits on success and rolls back on error.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+                cached_statements=STATEMENT_CACHE_SIZE,
+            )
+            conn.row_factory = sqlite3.Row
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
         try:
             yield conn
             conn.commit()
-        finally:
+        except BaseException:
+            conn.rollback()
+            raise
+
+    def close(self) -> None:
+        """Close the calling thread's connection (reopened on next use)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
             conn.close()
+            self._local.conn = None
 
     def _migrate_sessions_schema(self, conn: sqlite3.Connection) -> None:
         """Migrate from old pid-based schema to client_id schema.
@@ -277,6 +381,9 @@ class SQLiteStorage:
         Both paths must result in identical schemas.
         """
         with self._connect() as conn:
+            # WAL lets pollers read while events are being written
+            self.journal_mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+
             # Create schema_version table first
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS schema_version (
@@ -326,6 +433,13 @@ class SQLiteStorage:
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_events_id ON events(id)
             """)
+            # Indexes for filtered polling: get_events(channel=...) / get_events(event_types=...)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_events_channel ON events(channel, id)
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_events_type ON events(event_type, id)
+            """)
             # Index for efficient session ordering by activity
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_sessions_heartbeat ON sessions(last_heartbeat)
@@ -414,6 +528,30 @@ class SQLiteStorage:
                 return self._row_to_session(row)
             return None
 
+    def session_exists(self, session_id: str) -> bool:
+        """Check whether an active session has this ID."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM sessions WHERE id = ? AND deleted_at IS NULL", (session_id,)
+            ).fetchone()
+            return row is not None
+
+    def get_sessions_by_ids(self, session_ids: Iterable[str]) -> dict[str, Session]:
+        """Get active sessions for several IDs in one query, keyed by ID.
+
+        IDs with no active session are absent from the result.
+        """
+        ids = tuple(dict.fromkeys(session_ids))
+        if not ids:
+            return {}
+        placeholders = ",".join("?" * len(ids))
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM sessions WHERE id IN ({placeholders}) AND deleted_at IS NULL",
+                ids,
+            ).fetchall()
+            return {row["id"]: self._row_to_session(row) for row in rows}
+
     def delete_session(self, session_id: str) -> bool:
         """Soft-delete a session by ID.
 
@@ -427,6 +565,19 @@ class SQLiteStorage:
             )
             return cursor.rowcount > 0
 
+    def delete_sessions(self, session_ids: list[str]) -> int:
+        """Soft-delete many sessions in one transaction.
+
+        Returns the number of sessions that were active and are now deleted.
+        """
+        now = datetime.now()
+        with self._connect() as conn:
+            cursor = conn.executemany(
+                "UPDATE sessions SET deleted_at = ? WHERE id = ? AND deleted_at IS NULL",
+                [(now, session_id) for session_id in session_ids],
+            )
+            return cursor.rowcount
+
     def update_heartbeat(self, session_id: str, timestamp: datetime) -> bool:
         """Update session heartbeat. Returns True if active session exists."""
         with self._connect() as conn:
@@ -445,6 +596,31 @@ class SQLiteStorage:
             )
             return result.rowcount > 0
 
+    def get_session_cursor(self, session_id: str) -> str | None:
+        """Get an active session's last seen cursor without loading the whole row."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT last_cursor FROM sessions WHERE id = ? AND deleted_at IS NULL",
+                (session_id,),
+            ).fetchone()
+            return row[0] if row else None
+
+    def update_heartbeats(self, heartbeats: dict[str, datetime]) -> None:
+        """Update heartbeats for many active sessions in one transaction."""
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE sessions SET last_heartbeat = ? WHERE id = ? AND deleted_at IS NULL",
+                [(timestamp, session_id) for session_id, timestamp in heartbeats.items()],
+            )
+
+    def update_session_cursors(self, cursors: dict[str, str]) -> None:
+        """Update last seen cursors for many active sessions in one transaction."""
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE sessions SET last_cursor = ? WHERE id = ? AND deleted_at IS NULL",
+                [(cursor, session_id) for session_id, cursor in cursors.items()],
+            )
+
     def list_sessions(self) -> list[Session]:
         """List all active sessions, ordered by most recently active first.
 
@@ -456,21 +632,51 @@ class SQLiteStorage:
             ).fetchall()
             return [self._row_to_session(row) for row in rows]
 
-    def cleanup_stale_sessions(self, timeout_seconds: int = SESSION_TIMEOUT) -> int:
+    def channel_subscriber_counts(self) -> list[tuple[str, int]]:
+        """Count active sessions per implicit channel, ordered by channel name.
+
+        Mirrors Session.channels: every session is on "all",
+        "session:<id>", "repo:<repo>" and "machine:<machine>".
+        """
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT channel, COUNT(*) AS subscribers FROM (
+                    SELECT 'all' AS channel FROM sessions WHERE deleted_at IS NULL
+                    UNION ALL
+                    SELECT 'session:' || id FROM sessions WHERE deleted_at IS NULL
+                    UNION ALL
+                    SELECT 'repo:' || repo FROM sessions WHERE deleted_at IS NULL
+                    UNION ALL
+                    SELECT 'machine:' || machine FROM sessions WHERE deleted_at IS NULL
+                )
+                GROUP BY channel
+                ORDER BY channel
+            """).fetchall()
+            return [(row["channel"], row["subscribers"]) for row in rows]
+
+    def cleanup_stale_sessions(self, timeout_seconds: int = SESSION_TIMEOUT) -> list[str]:
         """Soft-delete sessions that haven't sent a heartbeat recently.
 
-        Returns the number of sessions marked as deleted.
+        Returns the IDs of the sessions marked as deleted.
         """
-        cutoff = datetime.now().timestamp() - timeout_seconds
-        cutoff_dt = datetime.fromtimestamp(cutoff)
         now = datetime.now()
+        cutoff = now - timedelta(seconds=timeout_seconds)
 
         with self._connect() as conn:
-            cursor = conn.execute(
-                "UPDATE sessions SET deleted_at = ? WHERE last_heartbeat < ? AND deleted_at IS NULL",
-                (now, cutoff_dt),
+            # Take the write lock first so no heartbeat lands between the select and update
+            conn.execute("BEGIN IMMEDIATE")
+            stale_ids = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT id FROM sessions WHERE last_heartbeat < ? AND deleted_at IS NULL",
+                    (cutoff,),
+                )
+            ]
+            conn.executemany(
+                "UPDATE sessions SET deleted_at = ? WHERE id = ?",
+                [(now, session_id) for session_id in stale_ids],
             )
-            return cursor.rowcount
+            return stale_ids
 
     def session_count(self) -> int:
         """Get count of active (non-deleted) sessions."""
@@ -483,18 +689,20 @@ class SQLiteStorage:
     # Event operations
 
     def add_event(
-        self, event_type: str, payload: str, session_id: str, channel: str = "all"
+        self,
+        event_type: str,
+        payload: str,
+        session_id: str,
+        channel: str = "all",
+        timestamp: datetime | None = None,
     ) -> Event:
-        """Add a new event and return it with assigned ID."""
-        now = datetime.now()
+        """Add a new event and return it with assigned ID.
+
+        timestamp defaults to now; callers that already read the clock pass theirs.
+        """
+        now = timestamp or datetime.now()
         with self._connect() as conn:
-            cursor = conn.execute(
-                """
-                INSERT INTO events (event_type, payload, session_id, timestamp, channel)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (event_type, payload, session_id, now, channel),
-            )
+            cursor = conn.execute(INSERT_EVENT_SQL, (event_type, payload, session_id, now, channel))
             event_id = cursor.lastrowid
 
             return Event(
@@ -506,6 +714,31 @@ class SQLiteStorage:
                 channel=channel,
             )
 
+    def add_events(self, events: list[tuple[str, str, str, str]]) -> list[Event]:
+        """Add several events in one transaction, returning them with assigned IDs.
+
+        Args:
+            events: (event_type, payload, session_id, channel) tuples, in insertion order.
+        """
+        now = datetime.now()
+        added = []
+        with self._connect() as conn:
+            for event_type, payload, session_id, channel in events:
+                cursor = conn.execute(
+                    INSERT_EVENT_SQL, (event_type, payload, session_id, now, channel)
+                )
+                added.append(
+                    Event(
+                        id=cursor.lastrowid,
+                        event_type=event_type,
+                        payload=payload,
+                        session_id=session_id,
+                        timestamp=now,
+                        channel=channel,
+                    )
+                )
+        return added
+
     def get_events(
         self,
         cursor: str | None = None,
@@ -527,9 +760,51 @@ class SQLiteStorage:
             Tuple of (events, next_cursor). Use next_cursor for subsequent calls.
             next_cursor is the cursor value if there are events, None otherwise.
         """
-        with self._connect() as conn:
-            effective_order = "DESC" if order == "desc" else "ASC"
+        rows, next_cursor = self._query_events(
+            EVENT_COLUMNS, cursor, limit, channels, order, event_types
+        )
+        events = [
+            Event(
+                id=row["id"],
+                event_type=row["event_type"],
+                payload=row["payload"],
+                session_id=row["session_id"],
+                timestamp=row["timestamp"],
+                channel=row["channel"],
+            )
+            for row in rows
+        ]
+        return events, next_cursor
 
+    def get_events_raw(
+        self,
+        cursor: str | None = None,
+        limit: int = 50,
+        channels: list[str] | None = None,
+        order: Literal["asc", "desc"] = "desc",
+        event_types: list[str] | None = None,
+    ) -> tuple[list[dict], str | None]:
+        """Like get_events(), but return plain dicts ready for a JSON response.
+
+        Skips building Event objects, and timestamps stay as the stored ISO
+        strings rather than round-tripping through datetime.
+        """
+        rows, next_cursor = self._query_events(
+            EVENT_COLUMNS_RAW, cursor, limit, channels, order, event_types
+        )
+        return [dict(row) for row in rows], next_cursor
+
+    def _query_events(
+        self,
+        columns: str,
+        cursor: str | None,
+        limit: int,
+        channels: list[str] | None,
+        order: Literal["asc", "desc"],
+        event_types: list[str] | None,
+    ) -> tuple[list[sqlite3.Row], str | None]:
+        """Run the paginated events query shared by get_events and get_events_raw."""
+        with self._connect() as conn:
             # Decode cursor to event ID (cursor is opaque string encoding an ID)
             # Handle malformed cursors gracefully by resetting to start
             since_id = 0
@@ -539,66 +814,31 @@ class SQLiteStorage:
                 except ValueError:
                     since_id = 0  # Malformed cursor, reset to start
 
-            # Build WHERE clause based on cursor
-            if since_id == 0:
-                where_clause = ""
-                params_base: tuple = ()
-            else:
-                where_clause = "WHERE id > ?"
-                params_base = (since_id,)
-
-            if channels:
-                placeholders = ",".join("?" * len(channels))
-                channel_filter = f"channel IN ({placeholders})"
-                if where_clause:
-                    where_clause += f" AND {channel_filter}"
-                else:
-                    where_clause = f"WHERE {channel_filter}"
-                params_base = (*params_base, *channels)
-
-            if event_types and len(event_types) > 0:
-                placeholders = ",".join("?" * len(event_types))
-                type_filter = f"event_type IN ({placeholders})"
-                if where_clause:
-                    where_clause += f" AND {type_filter}"
-                else:
-                    where_clause = f"WHERE {type_filter}"
-                params_base = (*params_base, *event_types)
-
-            params = (*params_base, limit)
-
-            query = f"""
-                SELECT * FROM events
-                {where_clause}
-                ORDER BY id {effective_order}
-                LIMIT ?
-            """
+            # Filters compile to IN (...) predicates so SQLite can range-scan
+            # idx_events_channel / idx_events_type instead of returning rows for
+            # Python to discard. Omitted filters add no predicate.
+            unique_channels = tuple(dict.fromkeys(channels)) if channels else ()
+            unique_types = tuple(dict.fromkeys(event_types)) if event_types else ()
+            query = _events_query(
+                columns, order, bool(since_id), len(unique_channels), len(unique_types)
+            )
+            params = (
+                *((since_id,) if since_id else ()),
+                *unique_channels,
+                *unique_types,
+                limit,
+            )
             rows = conn.execute(query, params).fetchall()
 
-            events = [
-                Event(
-                    id=row["id"],
-                    event_type=row["event_type"],
-                    payload=row["payload"],
-                    session_id=row["session_id"],
-                    timestamp=row["timestamp"],
-                    channel=row["channel"] if "channel" in row.keys() else "all",
-                )
-                for row in rows
-            ]
-
-            # Compute next_cursor from the events based on order
-            # For DESC: next_cursor is the MIN id (oldest in this batch)
-            # For ASC: next_cursor is the MAX id (newest in this batch)
-            if events:
-                if order == "desc":
-                    next_cursor = str(min(e.id for e in events))
-                else:
-                    next_cursor = str(max(e.id for e in events))
+            # Compute next_cursor from the rows based on order (rows are sorted by id)
+            # For DESC: next_cursor is the MIN id (oldest in this batch, last row)
+            # For ASC: next_cursor is the MAX id (newest in this batch, last row)
+            if rows:
+                next_cursor = str(rows[-1]["id"])
             else:
                 next_cursor = cursor  # No new events, keep same cursor
 
-            return events, next_cursor
+            return rows, next_cursor
 
     def get_cursor(self) -> str | None:
         """Get a cursor pointing to the most recent event.
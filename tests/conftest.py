@@ -35,8 +35,9 @@ def temp_db():
     with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
         db_path = f.name
     yield db_path
-    # Cleanup
-    Path(db_path).unlink(missing_ok=True)
+    # Cleanup (including WAL sidecar files)
+    for suffix in ("", "-wal", "-shm"):
+        Path(db_path + suffix).unlink(missing_ok=True)
 
 
 @pytest.fixture
@@ -58,7 +59,7 @@ def clean_storage():
     Note: Imports are inside fixture to avoid triggering module-level storage
     initialization in server.py before AGENT_EVENT_BUS_DB is set by pytest_configure.
     """
-    from agent_event_bus import server
+    from agent_event_bus import helpers, server
     from agent_event_bus.storage import SQLiteStorage
 
     # Clear all sessions and events
@@ -66,6 +67,16 @@ def clean_storage():
         server.storage.delete_session(session.id)
     # Clear events by recreating storage
     server.storage = SQLiteStorage(db_path=os.environ["AGENT_EVENT_BUS_DB"])
+    # Reset in-memory server state that would otherwise leak between tests
+    server._last_persisted_heartbeat.clear()
+    server._last_cursor_write.clear()
+    server._empty_poll_streak.clear()
+    server._invalidate_live_sessions()
+    server._last_stale_cleanup = 0.0
+    helpers._liveness_cache.clear()
+    helpers._liveness_pruned_at = 0.0
+    helpers._find_executable.cache_clear()
+    helpers._icon_args.cache_clear()
     yield
 
 
@@ -0,0 +1,287 @@
+"""Tests for background workers."""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from agent_event_bus.background import (
+    EventBatcher,
+    NotificationQueue,
+    PeriodicTask,
+    SessionWriteQueue,
+    start_log_listener,
+)
+from agent_event_bus.storage import Session
+
+
+@pytest.fixture
+def session(storage):
+    """An active session in the temp storage."""
+    now = datetime.now()
+    s = Session(
+        id="writer-test",
+        display_id="brave-tiger",
+        name="test",
+        machine="localhost",
+        cwd="/test",
+        repo="test",
+        registered_at=now,
+        last_heartbeat=now,
+    )
+    storage.add_session(s)
+    return s
+
+
+class TestSessionWriteQueue:
+    """Tests for SessionWriteQueue."""
+
+    def test_stop_flushes_pending_writes(self, storage, session):
+        """Queued heartbeat and cursor updates are committed on stop."""
+        writer = SessionWriteQueue(storage, batch_window=10)
+        writer.start()
+
+        later = session.last_heartbeat + timedelta(minutes=5)
+        writer.put_heartbeat(session.id, later)
+        writer.put_cursor(session.id, "42")
+        writer.stop(timeout=5)
+
+        stored = storage.get_session(session.id)
+        assert stored.last_heartbeat == later
+        assert stored.last_cursor == "42"
+
+    def test_latest_value_per_session_wins(self, storage, session):
+        """Multiple updates for one session in a batch collapse to the latest."""
+        writer = SessionWriteQueue(storage, batch_window=10)
+        writer.start()
+
+        writer.put_cursor(session.id, "1")
+        writer.put_cursor(session.id, "2")
+        writer.put_cursor(session.id, "3")
+        writer.stop(timeout=5)
+
+        assert storage.get_session(session.id).last_cursor == "3"
+
+    def test_flush_failure_is_logged_not_raised(self, storage, session, monkeypatch, caplog):
+        """A failing flush is logged and the writer still shuts down cleanly."""
+
+        def boom(_):
+            raise RuntimeError("disk on fire")
+
+        monkeypatch.setattr(storage, "update_session_cursors", boom)
+        writer = SessionWriteQueue(storage, batch_window=10)
+        writer.start()
+        writer.put_cursor(session.id, "1")
+        writer.stop(timeout=5)
+
+        assert "Failed to flush session writes" in caplog.text
+        assert storage.get_session(session.id).last_cursor is None
+
+    def test_stop_without_start_is_noop(self, storage):
+        """Stopping a writer that was never started does nothing."""
+        SessionWriteQueue(storage).stop()
+
+
+class TestEventBatcher:
+    """Tests for EventBatcher."""
+
+    def test_batch_resolves_futures_with_ids_in_order(self, storage):
+        """Events submitted together are stored in order and each future gets its event."""
+        batcher = EventBatcher(storage, batch_window=10)
+        batcher.start()
+
+        futures = [batcher.submit(f"e{i}", f"msg{i}", "s1", "all") for i in range(3)]
+        batcher.stop(timeout=5)
+
+        events = [f.result(timeout=1) for f in futures]
+        assert [e.event_type for e in events] == ["e0", "e1", "e2"]
+        assert events[0].id < events[1].id < events[2].id
+
+        stored, _ = storage.get_events(order="asc")
+        assert [e.id for e in stored] == [e.id for e in events]
+
+    def test_batch_size_is_capped(self, storage, monkeypatch):
+        """A burst larger than max_batch is split across transactions."""
+        batch_sizes = []
+        original = storage.add_events
+        monkeypatch.setattr(
+            storage, "add_events", lambda rows: batch_sizes.append(len(rows)) or original(rows)
+        )
+
+        batcher = EventBatcher(storage, max_batch=2, batch_window=10)
+        for i in range(5):
+            batcher.submit(f"e{i}", "msg", "s1", "all")
+        batcher.start()
+        batcher.stop(timeout=5)
+
+        assert batch_sizes == [2, 2, 1]
+
+    def test_cancelled_submissions_are_skipped(self, storage):
+        """A submission cancelled before the writer reaches it is never inserted."""
+        batcher = EventBatcher(storage, batch_window=10)
+        cancelled = batcher.submit("dropped", "msg", "s1", "all")
+        kept = batcher.submit("kept", "msg", "s1", "all")
+        assert cancelled.cancel()
+
+        batcher.start()
+        batcher.stop(timeout=5)
+
+        assert kept.result(timeout=1).event_type == "kept"
+        stored, _ = storage.get_events()
+        assert [e.event_type for e in stored] == ["kept"]
+
+    def test_insert_failure_propagates_to_callers(self, storage, monkeypatch):
+        """If the batch insert fails, every waiting caller sees the error."""
+
+        def boom(_):
+            raise RuntimeError("disk on fire")
+
+        monkeypatch.setattr(storage, "add_events", boom)
+        batcher = EventBatcher(storage, batch_window=10)
+        batcher.start()
+        future = batcher.submit("e1", "msg", "s1", "all")
+        batcher.stop(timeout=5)
+
+        with pytest.raises(RuntimeError, match="disk on fire"):
+            future.result(timeout=1)
+
+
+class TestNotificationQueue:
+    """Tests for NotificationQueue."""
+
+    def test_delivers_queued_notifications(self):
+        """Queued notifications are sent, in order, by the worker thread."""
+        send = MagicMock(return_value=True)
+        notifier = NotificationQueue(send)
+        notifier.start()
+
+        assert notifier.put("One", "first")
+        assert notifier.put("Two", "second", sound=True)
+        notifier.stop(timeout=5)
+
+        assert [c.kwargs for c in send.call_args_list] == [
+            {"title": "One", "message": "first", "sound": False},
+            {"title": "Two", "message": "second", "sound": True},
+        ]
+
+    def test_drops_when_full(self, caplog):
+        """A full queue drops new notifications instead of blocking."""
+        notifier = NotificationQueue(MagicMock(), maxsize=1)
+
+        assert notifier.put("One", "first")
+        assert not notifier.put("Two", "second")
+        assert "Notification queue full" in caplog.text
+
+    def test_send_failure_is_logged(self, caplog):
+        """A failing send is logged and later notifications still go out."""
+        send = MagicMock(side_effect=[RuntimeError("no display"), True])
+        notifier = NotificationQueue(send)
+        notifier.start()
+
+        notifier.put("One", "first")
+        notifier.put("Two", "second")
+        notifier.stop(timeout=5)
+
+        assert send.call_count == 2
+        assert "Failed to send notification 'One'" in caplog.text
+
+
+class TestPeriodicTask:
+    """Tests for PeriodicTask."""
+
+    def test_runs_immediately_and_repeats(self):
+        """The task runs on start and again after each interval."""
+        ran = threading.Semaphore(0)
+        task = PeriodicTask(ran.release, interval=0.01, name="test")
+        task.start()
+        try:
+            assert ran.acquire(timeout=5)
+            assert ran.acquire(timeout=5)
+        finally:
+            task.stop(timeout=5)
+
+    def test_stop_interrupts_wait(self):
+        """stop() returns promptly instead of waiting out the interval."""
+        func = MagicMock()
+        task = PeriodicTask(func, interval=3600, name="test")
+        task.start()
+        task.stop(timeout=5)
+
+        assert func.call_count == 1
+
+    def test_failure_is_logged_and_schedule_continues(self, caplog):
+        """A failing run is logged and the next run still happens."""
+        ran = threading.Event()
+        calls = []
+
+        def sweep():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("db busy")
+            ran.set()
+
+        task = PeriodicTask(sweep, interval=0.01, name="sweeper")
+        task.start()
+        try:
+            assert ran.wait(timeout=5)
+        finally:
+            task.stop(timeout=5)
+
+        assert "Periodic task sweeper failed: db busy" in caplog.text
+
+
+class _RecordingHandler(logging.Handler):
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.records: list[tuple[str, threading.Thread]] = []
+
+    def emit(self, record):
+        self.records.append((record.getMessage(), threading.current_thread()))
+
+
+class TestStartLogListener:
+    """Tests for start_log_listener."""
+
+    def test_handlers_write_on_listener_thread(self):
+        """Records reach the original handlers, written from the listener thread."""
+        log = logging.getLogger("agent-event-bus.test-listener")
+        log.propagate = False
+        handler = _RecordingHandler()
+        log.addHandler(handler)
+        try:
+            listener = start_log_listener(log)
+            assert listener is not None
+            assert handler not in log.handlers
+
+            log.warning("hello %s", "world")
+            listener.stop()
+
+            assert handler.records
+            message, thread = handler.records[0]
+            assert message == "hello world"
+            assert thread is not threading.current_thread()
+        finally:
+            log.handlers.clear()
+
+    def test_respects_handler_levels(self):
+        """A handler's own level still filters records."""
+        log = logging.getLogger("agent-event-bus.test-listener-levels")
+        log.propagate = False
+        log.setLevel(logging.DEBUG)
+        handler = _RecordingHandler(logging.INFO)
+        log.addHandler(handler)
+        try:
+            listener = start_log_listener(log)
+            log.debug("dropped")
+            log.info("kept")
+            listener.stop()
+
+            assert [m for m, _ in handler.records] == ["kept"]
+        finally:
+            log.handlers.clear()
+
+    def test_no_handlers(self):
+        """Nothing to move means no listener."""
+        assert start_log_listener(logging.getLogger("agent-event-bus.test-empty")) is None
@@ -1,5 +1,7 @@
 """Tests for CLI wrapper."""
 
+import subprocess
+import sys
 from argparse import Namespace
 from unittest.mock import MagicMock, patch
 
@@ -9,14 +11,21 @@ from agent_event_bus import cli
 from conftest import make_events_args
 
 
+def _sse_lines(body: str) -> list[bytes]:
+    """Split an SSE body the way Response.iter_lines() yields it."""
+    return body.encode().splitlines()
+
+
 class TestCallTool:
     """Tests for call_tool function."""
 
-    @patch("agent_event_bus.cli.requests.post")
+    @patch("requests.Session.post")
     def test_successful_call_structured_content(self, mock_post):
         """Test successful tool call with structured content response."""
         mock_response = MagicMock()
-        mock_response.text = 'data: {"result": {"structuredContent": {"result": {"session_id": "abc123", "name": "test"}}}}\n'
+        mock_response.iter_lines.return_value = _sse_lines(
+            'data: {"result": {"structuredContent": {"result": {"session_id": "abc123", "name": "test"}}}}\n'
+        )
         mock_response.raise_for_status = MagicMock()
         mock_post.return_value = mock_response
 
@@ -25,11 +34,13 @@ class TestCallTool:
         assert result == {"session_id": "abc123", "name": "test"}
         mock_post.assert_called_once()
 
-    @patch("agent_event_bus.cli.requests.post")
+    @patch("requests.Session.post")
     def test_successful_call_text_content(self, mock_post):
         """Test successful tool call with text content response."""
         mock_response = MagicMock()
-        mock_response.text = 'data: {"result": {"content": [{"text": "{\\"success\\": true}"}]}}\n'
+        mock_response.iter_lines.return_value = _sse_lines(
+            'data: {"result": {"content": [{"text": "{\\"success\\": true}"}]}}\n'
+        )
         mock_response.raise_for_status = MagicMock()
         mock_post.return_value = mock_response
 
@@ -37,7 +48,7 @@ class TestCallTool:
 
         assert result == {"success": True}
 
-    @patch("agent_event_bus.cli.requests.post")
+    @patch("requests.Session.post")
     def test_connection_error(self, mock_post):
         """Test connection error handling."""
         import requests
@@ -49,11 +60,11 @@ class TestCallTool:
 
         assert exc_info.value.code == 1
 
-    @patch("agent_event_bus.cli.requests.post")
+    @patch("requests.Session.post")
     def test_empty_response(self, mock_post):
         """Test handling of empty response."""
         mock_response = MagicMock()
-        mock_response.text = ""
+        mock_response.iter_lines.return_value = _sse_lines("")
         mock_response.raise_for_status = MagicMock()
         mock_post.return_value = mock_response
 
@@ -61,7 +72,7 @@ class TestCallTool:
 
         assert result == {}
 
-    @patch("agent_event_bus.cli.requests.post")
+    @patch("requests.Session.post")
     def test_debug_false_prints_error_and_exits(self, mock_post, capsys):
         """Test that debug=False (default) prints error and exits."""
         mock_post.side_effect = ValueError("Something went wrong")
@@ -73,7 +84,7 @@ class TestCallTool:
         captured = capsys.readouterr()
         assert "Something went wrong" in captured.err
 
-    @patch("agent_event_bus.cli.requests.post")
+    @patch("requests.Session.post")
     def test_debug_true_propagates_exception(self, mock_post):
         """Test that debug=True causes exception to propagate."""
         mock_post.side_effect = ValueError("Something went wrong")
@@ -83,11 +94,11 @@ class TestCallTool:
 
         assert "Something went wrong" in str(exc_info.value)
 
-    @patch("agent_event_bus.cli.requests.post")
+    @patch("requests.Session.post")
     def test_multiline_sse_response(self, mock_post):
         """Test parsing multiline SSE response."""
         mock_response = MagicMock()
-        mock_response.text = (
+        mock_response.iter_lines.return_value = _sse_lines(
             "event: message\n"
             'data: {"result": {"structuredContent": {"result": [{"name": "session1"}]}}}\n'
             "\n"
@@ -99,6 +110,39 @@ class TestCallTool:
 
         assert result == [{"name": "session1"}]
 
+    @patch("requests.Session.post")
+    def test_streams_and_closes_response(self, mock_post):
+        """Test that the response is streamed and closed after parsing."""
+        mock_response = MagicMock()
+        mock_response.iter_lines.return_value = _sse_lines(
+            'event: message\ndata: {"result": {"structuredContent": {"result": 1}}}\n\n'
+        )
+        mock_post.return_value = mock_response
+
+        assert cli.call_tool("list_sessions", {}) == 1
+        assert mock_post.call_args.kwargs["stream"] is True
+        mock_response.close.assert_called_once()
+
+    @patch("requests.Session.post")
+    def test_stops_reading_after_first_data_frame(self, mock_post):
+        """Test that trailing SSE frames (e.g. keep-alive pings) are never read."""
+
+        def lines(chunk_size=None):
+            yield b"event: message"
+            yield b'data: {"result": {"structuredContent": {"result": 1}}}'
+            raise AssertionError("read past the first data frame")
+
+        mock_response = MagicMock()
+        mock_response.iter_lines.side_effect = lines
+        mock_post.return_value = mock_response
+
+        assert cli.call_tool("list_sessions", {}) == 1
+        mock_response.close.assert_called_once()
+
+    def test_reuses_http_session(self):
+        """Test that calls share one keep-alive HTTP session."""
+        assert cli._http_session() is cli._http_session()
+
 
 class TestCmdRegister:
     """Tests for register command."""
@@ -319,6 +363,36 @@ class TestCmdEvents:
         captured = capsys.readouterr()
         assert "No events" in captured.out
 
+    @patch("agent_event_bus.cli.call_tool")
+    def test_events_text_output_format(self, mock_call, capsys):
+        """Test the exact text layout: three lines plus a blank line per event."""
+        events = [
+            {
+                "id": i,
+                "event_type": "task_completed",
+                "channel": "all",
+                "payload": f"done {i}",
+                "session_id": "abc",
+                "timestamp": "2024-01-01T12:00:00",
+            }
+            for i in (2, 1)
+        ]
+        mock_call.return_value = {"events": events, "next_cursor": "2"}
+
+        cli.cmd_events(make_events_args())
+
+        captured = capsys.readouterr()
+        assert captured.out == (
+            "[2] task_completed (all)\n"
+            "    done 2\n"
+            "    from: abc at 2024-01-01T12:00:00\n"
+            "\n"
+            "[1] task_completed (all)\n"
+            "    done 1\n"
+            "    from: abc at 2024-01-01T12:00:00\n"
+            "\n"
+        )
+
     @patch("agent_event_bus.cli.call_tool")
     def test_events_list(self, mock_call, capsys):
         """Test getting events."""
@@ -469,6 +543,35 @@ class TestCmdEvents:
         call_args = mock_call.call_args[0][1]
         assert call_args["event_types"] == ["task_completed", "ci_completed"]
 
+    @patch("agent_event_bus.cli.call_tool")
+    def test_events_include_dedupes_types(self, mock_call):
+        """Test that repeated --include types are sent once, in order."""
+        mock_call.return_value = {"events": [], "next_cursor": None}
+
+        args = make_events_args(include="ci_completed, task_completed,ci_completed")
+        cli.cmd_events(args)
+
+        assert mock_call.call_args[0][1]["event_types"] == ["ci_completed", "task_completed"]
+
+    @patch("agent_event_bus.cli.call_tool")
+    def test_events_exclude_text_output(self, mock_call, capsys):
+        """Test that --exclude applies to text output, including the empty case."""
+        noise = {
+            "id": 1,
+            "event_type": "session_registered",
+            "channel": "all",
+            "payload": "noise",
+            "session_id": "abc",
+            "timestamp": "2024-01-01T12:00:00",
+        }
+        mock_call.return_value = {"events": [noise], "next_cursor": "1"}
+
+        cli.cmd_events(make_events_args(exclude="session_registered"))
+
+        captured = capsys.readouterr()
+        assert "noise" not in captured.out
+        assert "No events" in captured.out
+
     @patch("agent_event_bus.cli.call_tool")
     def test_events_limit(self, mock_call):
         """Test limit parameter is passed through."""
@@ -639,6 +742,20 @@ class TestMainArgumentParsing:
                 # URL is passed to argument parser, verified it doesn't error
                 assert mock_cmd.called
 
+    def test_only_invoked_command_gets_arguments(self):
+        """Test that other subcommands' arguments aren't built."""
+        import sys
+
+        with patch.object(sys, "argv", ["cli", "sessions"]):
+            with (
+                patch("agent_event_bus.cli.cmd_sessions") as mock_cmd,
+                patch("agent_event_bus.cli._add_events_args") as mock_events_args,
+            ):
+                cli.main()
+
+                assert mock_cmd.called
+                mock_events_args.assert_not_called()
+
 
 class TestCmdChannels:
     """Tests for channels command."""
@@ -778,3 +895,22 @@ class TestCmdEventsWithChannel:
 
                 args = mock_cmd.call_args[0][0]
                 assert args.channel == "repo:my-repo"
+
+
+class TestColdStart:
+    """Tests for CLI import cost."""
+
+    def test_help_does_not_import_requests(self):
+        """Test that --help doesn't pay for importing requests."""
+        code = (
+            "import sys\n"
+            "from agent_event_bus import cli\n"
+            "sys.argv = ['agent-event-bus-cli', '--help']\n"
+            "try:\n"
+            "    cli.main()\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "assert 'requests' not in sys.modules, 'requests imported eagerly'\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
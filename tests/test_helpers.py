@@ -4,10 +4,12 @@ import os
 from datetime import datetime
 from unittest.mock import patch
 
+from agent_event_bus import helpers
 from agent_event_bus.helpers import (
     _dev_notify,
     escape_applescript_string,
     extract_repo_from_cwd,
+    forget_client_liveness,
     is_client_alive,
 )
 from agent_event_bus.storage import Session
@@ -30,6 +32,12 @@ class TestExtractRepoFromCwd:
             extract_repo_from_cwd("/home/user/myproject/.worktrees/feature-branch") == "myproject"
         )
 
+    def test_worktrees_substring_not_component(self):
+        """Test that '.worktrees' only counts as a whole path component."""
+        assert extract_repo_from_cwd("/home/user/my.worktrees") == "my.worktrees"
+        assert extract_repo_from_cwd("/home/user/.worktrees-old/feature") == "feature"
+        assert extract_repo_from_cwd("/home/user/myproject/.worktrees/") == "myproject"
+
     def test_empty_path(self):
         """Test empty path."""
         assert extract_repo_from_cwd("") == "unknown"
@@ -232,6 +240,48 @@ class TestIsClientAlive:
         # Should return True (process exists, we just can't signal it)
         assert is_client_alive("12345", is_local=True) is True
 
+    def test_result_cached_per_pid(self, monkeypatch):
+        """Test that repeated checks within the TTL reuse the first result."""
+        calls = []
+        monkeypatch.setattr("os.kill", lambda pid, sig: calls.append(pid))
+
+        assert is_client_alive("12345", is_local=True) is True
+        assert is_client_alive("12345", is_local=True) is True
+        assert calls == [12345]
+
+    def test_cache_expires(self, monkeypatch):
+        """Test that a result older than the TTL is re-checked."""
+        calls = []
+        monkeypatch.setattr("os.kill", lambda pid, sig: calls.append(pid))
+        monkeypatch.setattr(helpers, "LIVENESS_CACHE_TTL", 0)
+
+        is_client_alive("12345", is_local=True)
+        is_client_alive("12345", is_local=True)
+        assert calls == [12345, 12345]
+
+    def test_forget_client_liveness(self, monkeypatch):
+        """Test that forgetting a client forces a fresh check."""
+        calls = []
+        monkeypatch.setattr("os.kill", lambda pid, sig: calls.append(pid))
+
+        is_client_alive("12345", is_local=True)
+        forget_client_liveness("12345")
+        forget_client_liveness("not-a-pid")  # No-op
+        forget_client_liveness(None)  # No-op
+        is_client_alive("12345", is_local=True)
+        assert calls == [12345, 12345]
+
+    def test_expired_liveness_entries_pruned(self, monkeypatch):
+        """Test that stale results for PIDs never checked again are dropped."""
+        monkeypatch.setattr("os.kill", lambda pid, sig: None)
+        clock = [100.0]
+        monkeypatch.setattr("time.monotonic", lambda: clock[0])
+
+        is_client_alive("12345", is_local=True)
+        clock[0] += helpers.LIVENESS_CACHE_TTL
+        is_client_alive("67890", is_local=True)
+        assert set(helpers._liveness_cache) == {67890}
+
 
 class TestDevNotify:
     """Tests for _dev_notify helper."""
@@ -252,3 +302,12 @@ class TestDevNotify:
         with patch("agent_event_bus.helpers.send_notification") as mock_notify:
             _dev_notify("test_tool", "summary")
             mock_notify.assert_not_called()
+
+    def test_server_skips_dev_notify_when_disabled(self, monkeypatch):
+        """Test that server tools don't call _dev_notify at all outside dev mode."""
+        from agent_event_bus import server
+
+        monkeypatch.setattr(server, "DEV_MODE", False)
+        with patch("agent_event_bus.server._dev_notify") as mock_dev_notify:
+            server.publish_event.fn("test", "payload")
+            mock_dev_notify.assert_not_called()
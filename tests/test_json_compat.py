@@ -0,0 +1,37 @@
+"""Tests for json_compat module (optional orjson fast path)."""
+
+import json
+
+import pytest
+
+from agent_event_bus import json_compat
+
+
+class TestJsonCompat:
+    """Tests for loads/dumps."""
+
+    def test_round_trip(self):
+        """dumps output parses back to the same structure."""
+        data = {"events": [{"id": 1, "payload": "héllo 🎉"}], "next_cursor": None}
+        assert json_compat.loads(json_compat.dumps(data)) == data
+
+    def test_dumps_is_standard_json(self):
+        """dumps returns a str the stdlib parser accepts."""
+        encoded = json_compat.dumps({"a": [1, 2]})
+        assert isinstance(encoded, str)
+        assert json.loads(encoded) == {"a": [1, 2]}
+
+    def test_dumps_indent(self):
+        """dumps_indent produces two-space indented JSON with either backend."""
+        encoded = json_compat.dumps_indent({"a": [1, 2]})
+        assert encoded.splitlines()[1].startswith('  "a":')
+        assert json.loads(encoded) == {"a": [1, 2]}
+
+    def test_loads_accepts_bytes(self):
+        """loads parses bytes directly (no decode step needed by callers)."""
+        assert json_compat.loads(b'{"ok": true}') == {"ok": True}
+
+    def test_invalid_json_raises_value_error(self):
+        """Malformed input raises a ValueError subclass with either backend."""
+        with pytest.raises(ValueError):
+            json_compat.loads("{not json")
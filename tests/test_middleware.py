@@ -1,5 +1,7 @@
 """Tests for middleware formatting functions."""
 
+import json
+import logging
 from unittest.mock import patch
 
 import pytest
@@ -11,14 +13,20 @@ from agent_event_bus.middleware import (
     _GREEN,
     _MAGENTA,
     _RED,
+    MAX_LOG_BODY,
+    RequestLoggingMiddleware,
     TailscaleAuthMiddleware,
+    _fast_json,
+    _FirstDataLineBuffer,
     _format_args,
     _format_list,
     _format_result,
     _format_session_id_value,
     _get_active_sessions_map,
     _is_human_readable_id,
+    _lookup_session_display_id,
     _parse_sse_response,
+    _peek_tool_call,
 )
 
 
@@ -64,6 +72,14 @@ class TestFormatArgs:
         assert "b712a0ba" in result  # First 8 chars
         assert "1ee6" not in result  # Rest is truncated
 
+    def test_skip_key(self):
+        """The skipped key is omitted without affecting the others."""
+        args = {"session_id": "brave-tiger", "limit": 10}
+        result = _format_args(args, skip="session_id")
+        assert result == "limit=10"
+        assert "session_id" in args  # Caller's dict is untouched
+        assert _format_args({"session_id": "x"}, skip="session_id") == ""
+
     def test_multiple_args(self):
         """Multiple args are comma-separated."""
         result = _format_args({"limit": 10, "order": "desc"})
@@ -72,6 +88,23 @@ class TestFormatArgs:
         assert ", " in result
 
 
+class TestFastJson:
+    """Tests for _fast_json scalar fast path."""
+
+    @pytest.mark.parametrize(
+        "value",
+        [None, True, False, 0, -5, 10**30, 1.5, "x", "", 'a"b', "a\\b", "é", "tab\there"],
+    )
+    def test_scalars_match_json_dumps(self, value):
+        """Scalars encode exactly as json.dumps would."""
+        assert _fast_json(value) == json.dumps(value)
+
+    @pytest.mark.parametrize("value", [{"a": [1, 2]}, [10**30], {1: "int key"}, []])
+    def test_containers_match_json_dumps(self, value):
+        """Containers encode exactly as json.dumps would, whichever JSON backend is installed."""
+        assert _fast_json(value) == json.dumps(value)
+
+
 class TestFormatList:
     """Tests for _format_list function."""
 
@@ -93,6 +126,23 @@ class TestFormatList:
         # Human-readable IDs use BOLD when not in DB (no lookup)
         assert _BOLD in result
 
+    def test_session_list_resolves_missing_display_ids_once(self):
+        """Items without display_id are resolved from one session-map fetch."""
+        items = [
+            {"session_id": "uuid-1", "display_id": "brave-tiger"},
+            {"session_id": "uuid-2"},
+            {"session_id": "uuid-3"},
+        ]
+        with patch(
+            "agent_event_bus.middleware._get_active_sessions_map",
+            return_value={"uuid-2": "happy-falcon"},
+        ) as mock_map:
+            result = _format_list(items)
+        mock_map.assert_called_once()
+        assert f"{_CYAN}brave-tiger" in result
+        assert f"{_CYAN}happy-falcon" in result
+        assert "uuid-3" in result
+
     def test_channel_list(self):
         """List with channel+subscribers shows channel names."""
         items = [
@@ -192,6 +242,37 @@ class TestFormatResult:
             assert "2026-01-01T12:30" in result
             assert "→" in result
 
+    def test_events_result_repeated_publisher_listed_once(self):
+        """A publisher with many events is listed once and the timespan covers all events."""
+        events = [
+            {"id": i, "session_id": "brave-tiger", "timestamp": f"2026-01-01T12:{i:02d}:00"}
+            for i in range(10, 0, -1)
+        ]
+        with patch(
+            "agent_event_bus.middleware._get_active_sessions_map",
+            return_value={"brave-tiger": "brave-tiger"},
+        ):
+            result = _format_result({"events": events, "next_cursor": "10"})
+        assert result.count("brave-tiger") == 1
+        assert "2026-01-01T12:01 → 2026-01-01T12:10" in result
+
+    def test_events_result_top_five_publishers(self):
+        """Only the first five publishers (active first, alphabetical) are named."""
+        names = ["zeta-one", "eta-two", "beta-three", "alpha-four", "gamma-five", "delta-six"]
+        events = [
+            {"id": i, "session_id": n, "timestamp": "2026-01-01T12:00:00"}
+            for i, n in enumerate(names)
+        ]
+        active = {"zeta-one": "zeta-one", "eta-two": "eta-two"}
+        with patch("agent_event_bus.middleware._get_active_sessions_map", return_value=active):
+            result = _format_result({"events": events, "next_cursor": "6"})
+        shown = ["eta-two", "zeta-one", "alpha-four", "beta-three", "delta-six"]
+        positions = [result.find(n) for n in shown]
+        assert -1 not in positions
+        assert positions == sorted(positions)
+        assert "gamma-five" not in result
+        assert "+1" in result
+
     def test_event_id_result(self):
         """Result with event_id shows event #N."""
         result = _format_result({"event_id": 42, "channel": "all"})
@@ -298,37 +379,101 @@ class TestParseSSEResponse:
 
     def test_valid_sse_response(self):
         """Valid SSE response extracts JSON from data line."""
-        sse = 'event: message\ndata: {"result": {"session_id": "test"}}\n\n'
+        sse = b'event: message\ndata: {"result": {"session_id": "test"}}\n\n'
         result = _parse_sse_response(sse)
         assert result == {"result": {"session_id": "test"}}
 
     def test_multiline_sse_response(self):
         """SSE with multiple data lines uses first valid one."""
-        sse = 'event: message\ndata: {"first": true}\nevent: other\ndata: {"second": true}\n\n'
+        sse = b'event: message\ndata: {"first": true}\nevent: other\ndata: {"second": true}\n\n'
         result = _parse_sse_response(sse)
         assert result == {"first": True}
 
     def test_empty_response(self):
         """Empty response returns empty dict."""
-        result = _parse_sse_response("")
+        result = _parse_sse_response(b"")
         assert result == {}
 
     def test_no_data_line(self):
         """Response without data line returns empty dict."""
-        result = _parse_sse_response("event: message\n\n")
+        result = _parse_sse_response(b"event: message\n\n")
         assert result == {}
 
     def test_invalid_json(self):
         """Invalid JSON in data line returns empty dict."""
-        result = _parse_sse_response("data: not-valid-json\n\n")
+        result = _parse_sse_response(b"data: not-valid-json\n\n")
         assert result == {}
 
+    def test_data_not_at_line_start_ignored(self):
+        """Only lines that start with 'data: ' are data fields."""
+        sse = b'event: x data: {"wrong": true}\ndata: {"right": true}'
+        assert _parse_sse_response(sse) == {"right": True}
+
+    def test_crlf_line_endings(self):
+        """CRLF-terminated SSE lines parse."""
+        assert _parse_sse_response(b'event: message\r\ndata: {"ok": 1}\r\n\r\n') == {"ok": 1}
+
     def test_data_prefix_only(self):
         """data: prefix without content returns empty dict."""
-        result = _parse_sse_response("data: \n\n")
+        result = _parse_sse_response(b"data: \n\n")
         assert result == {}
 
 
+class TestPeekToolCall:
+    """Tests for recovering tool names from oversized request prefixes."""
+
+    def test_name_before_arguments(self):
+        prefix = b'{"jsonrpc": "2.0", "method": "tools/call", "params": {"name": "notify", "argu'
+        assert _peek_tool_call(prefix) == {"method": "tools/call", "params": {"name": "notify"}}
+
+    def test_name_not_in_prefix(self):
+        prefix = b'{"jsonrpc": "2.0", "method": "tools/call", "params": {"arguments": {"x": "aaa'
+        assert _peek_tool_call(prefix)["params"]["name"] == "?"
+
+    def test_other_method(self):
+        assert _peek_tool_call(b'{"method": "resources/read", "params": {"uri": "x') is None
+
+
+class TestFirstDataLineBuffer:
+    """Tests for incremental SSE capture."""
+
+    def test_byte_by_byte(self):
+        """A data line split across many chunks is captured and then buffering stops."""
+        sse = b'event: message\ndata: {"ok": true}\n\n: keep-alive\n\n'
+        buf = _FirstDataLineBuffer()
+        for i in range(len(sse)):
+            buf.feed(sse[i : i + 1])
+        assert buf.complete
+        assert _parse_sse_response(buf.body) == {"ok": True}
+        assert b"keep-alive" not in buf.body
+
+    def test_ignores_data_mid_line(self):
+        """'data: ' that isn't at a line start doesn't count."""
+        buf = _FirstDataLineBuffer()
+        buf.feed(b"event: x data: {}\n")
+        assert not buf.complete
+        buf.feed(b'data: {"right": 1}\n')
+        assert buf.complete
+        assert _parse_sse_response(buf.body) == {"right": 1}
+
+    def test_incomplete_line(self):
+        """Without the terminating newline the line isn't complete yet."""
+        buf = _FirstDataLineBuffer()
+        buf.feed(b'data: {"partial"')
+        assert not buf.complete
+
+    def test_oversized_line_truncated(self):
+        """A data line past max_bytes drops the buffer and stops capturing."""
+        buf = _FirstDataLineBuffer(max_bytes=16)
+        buf.feed(b'data: {"x": "')
+        buf.feed(b"a" * 32)
+        assert buf.complete
+        assert buf.truncated
+        assert buf.body == b""
+        buf.feed(b'"}\n')
+        assert buf.body == b""
+
+
 class TestIsHumanReadableId:
     """Tests for _is_human_readable_id function."""
 
@@ -403,6 +548,31 @@ class TestGetActiveSessionsMap:
         result = _get_active_sessions_map()
         assert isinstance(result, dict)
 
+    def test_reuses_map_until_invalidated(self):
+        """A burst of lookups costs one storage query; invalidation forces a reload."""
+        from agent_event_bus import middleware, server
+
+        with patch.object(
+            server.storage, "list_sessions", wraps=server.storage.list_sessions
+        ) as mock_list:
+            _get_active_sessions_map()
+            _get_active_sessions_map()
+            _lookup_session_display_id("b712a0ba-1ee6-4c18-a647-31a785147665")
+            assert mock_list.call_count == 1
+
+            middleware.invalidate_sessions_map()
+            _get_active_sessions_map()
+            assert mock_list.call_count == 2
+
+    def test_registered_session_resolves_immediately(self):
+        """Registering a session invalidates the map, so its display_id resolves."""
+        from agent_event_bus import server
+
+        _get_active_sessions_map()  # Warm the cache before the session exists
+        result = server.register_session.fn(name="fresh", machine="test", cwd="/test")
+
+        assert _lookup_session_display_id(result["session_id"]) == result["display_id"]
+
 
 class TestInactiveSessionHighlighting:
     """Tests for inactive session highlighting in event results."""
@@ -666,3 +836,193 @@ class TestTailscaleAuthMiddleware:
 
         assert not mock_app.called
         assert responses[0]["status"] == 401
+
+
+class TestRequestLoggingMiddleware:
+    """Tests for RequestLoggingMiddleware."""
+
+    @staticmethod
+    def _tool_call(name: str, arguments: dict) -> bytes:
+        return json.dumps(
+            {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "tools/call",
+                "params": {"name": name, "arguments": arguments},
+            }
+        ).encode()
+
+    @staticmethod
+    def _app(*response_chunks: bytes):
+        """ASGI app that drains the request and replies with the given body chunks."""
+
+        async def app(scope, receive, send):
+            app.receive = receive
+            app.send = send
+            while (await receive()).get("more_body"):
+                pass
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            for i, chunk in enumerate(response_chunks, 1):
+                more = i < len(response_chunks)
+                await send({"type": "http.response.body", "body": chunk, "more_body": more})
+
+        return app
+
+    async def _run(self, app, *request_chunks: bytes):
+        middleware = RequestLoggingMiddleware(app)
+        scope = {"type": "http", "path": "/mcp", "method": "POST", "headers": []}
+        pending = list(request_chunks)
+
+        async def receive():
+            body = pending.pop(0)
+            return {"type": "http.request", "body": body, "more_body": bool(pending)}
+
+        responses = []
+
+        async def send(message):
+            responses.append(message)
+
+        await middleware(scope, receive, send)
+        return receive, send, responses
+
+    @pytest.mark.asyncio
+    async def test_logs_tool_call(self, caplog):
+        """A tool call is logged as one line with the tool name and formatted result."""
+        app = self._app(
+            b'event: message\ndata: {"result": {"structuredContent": {"success": true}}}\n\n'
+        )
+
+        with caplog.at_level(logging.INFO, logger="agent-event-bus"):
+            _, _, responses = await self._run(app, self._tool_call("notify", {"title": "Hi"}))
+
+        assert responses[-1]["body"].startswith(b"event: message")
+        messages = [r.getMessage() for r in caplog.records]
+        assert len(messages) == 1
+        assert "notify" in messages[0]
+        assert "title" in messages[0]
+        assert "OK" in messages[0]
+
+    @pytest.mark.asyncio
+    async def test_skips_capture_when_info_disabled(self, caplog):
+        """With INFO disabled, receive/send are passed through unwrapped."""
+        app = self._app(b'data: {"result": {}}\n\n')
+
+        with caplog.at_level(logging.WARNING, logger="agent-event-bus"):
+            receive, send, _ = await self._run(app, self._tool_call("notify", {}))
+
+        assert app.receive is receive
+        assert app.send is send
+        assert not caplog.records
+
+    @pytest.mark.asyncio
+    async def test_chunked_bodies(self, caplog):
+        """Chunked request/response bodies are reassembled; trailing frames pass through."""
+        request = self._tool_call("publish_event", {"event_type": "x"})
+        app = self._app(
+            b'event: message\ndata: {"result": {"structuredContent": {"event_id": 7}}}\n\n',
+            b": keep-alive\n\n",
+        )
+
+        with caplog.at_level(logging.INFO, logger="agent-event-bus"):
+            _, _, responses = await self._run(app, request[:20], request[20:])
+
+        assert responses[-1]["body"] == b": keep-alive\n\n"
+        messages = [r.getMessage() for r in caplog.records]
+        assert len(messages) == 1
+        assert "event #7" in messages[0]
+
+    @pytest.mark.asyncio
+    async def test_request_body_across_many_chunks(self, caplog):
+        """Empty and multiple request chunks are accumulated without losing bytes."""
+        request = self._tool_call("publish_event", {"event_type": "x"})
+        app = self._app(b'data: {"result": {"structuredContent": {"event_id": 8}}}\n\n')
+
+        with caplog.at_level(logging.INFO, logger="agent-event-bus"):
+            await self._run(app, b"", request[:10], b"", request[10:30], request[30:])
+
+        messages = [r.getMessage() for r in caplog.records]
+        assert len(messages) == 1
+        assert "event #8" in messages[0]
+
+    @pytest.mark.asyncio
+    async def test_oversized_response_logged_as_truncated(self, caplog):
+        """Responses past MAX_LOG_BODY are forwarded intact but logged as truncated."""
+        big = (
+            b'data: {"result": {"structuredContent": {"blob": "' + b"a" * MAX_LOG_BODY + b'"}}}\n\n'
+        )
+        app = self._app(big[:100], big[100:])
+
+        with caplog.at_level(logging.INFO, logger="agent-event-bus"):
+            _, _, responses = await self._run(app, self._tool_call("get_events", {}))
+
+        assert b"".join(r.get("body", b"") for r in responses) == big
+        messages = [r.getMessage() for r in caplog.records]
+        assert len(messages) == 1
+        assert "<truncated>" in messages[0]
+
+    @pytest.mark.asyncio
+    async def test_oversized_request_logged_as_truncated(self, caplog):
+        """Requests past MAX_LOG_BODY are logged with the tool name and truncated args."""
+        request = self._tool_call("publish_event", {"payload": "a" * MAX_LOG_BODY})
+        app = self._app(b'data: {"result": {"structuredContent": {"event_id": 9}}}\n\n')
+
+        with caplog.at_level(logging.INFO, logger="agent-event-bus"):
+            _, _, responses = await self._run(app, request[:100], request[100:])
+
+        assert responses[-1]["body"].startswith(b"data: ")
+        messages = [r.getMessage() for r in caplog.records]
+        assert len(messages) == 1
+        assert "publish_event" in messages[0]
+        assert "<truncated>" in messages[0]
+        assert "event #9" in messages[0]
+
+    @pytest.mark.asyncio
+    async def test_oversized_non_tool_call_not_logged(self, caplog):
+        """Oversized requests whose prefix shows another method stay unlogged."""
+        request = json.dumps(
+            {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "resources/read",
+                "params": {"x": "a" * MAX_LOG_BODY},
+            }
+        ).encode()
+        app = self._app(b'data: {"result": {}}\n\n')
+
+        with caplog.at_level(logging.INFO, logger="agent-event-bus"):
+            await self._run(app, request)
+
+        assert caplog.records == []
+
+    @pytest.mark.asyncio
+    async def test_non_tool_call_not_logged(self, caplog):
+        """Non-tool-call requests (initialize, ping) and malformed bodies aren't logged."""
+        app = self._app(b'data: {"result": {"protocolVersion": "2025-03-26"}}\n\n')
+
+        with caplog.at_level(logging.INFO, logger="agent-event-bus"):
+            await self._run(app, b'{"jsonrpc": "2.0", "id": 1, "method": "initialize"}')
+            await self._run(app, b"{not json")
+
+        assert not caplog.records
+
+    @pytest.mark.asyncio
+    async def test_session_map_loaded_off_event_loop(self):
+        """A stale session map is reloaded in a worker thread, not on the loop thread."""
+        import threading
+
+        from agent_event_bus import middleware, server
+
+        query_threads = []
+        real_list_sessions = server.storage.list_sessions
+
+        def list_sessions():
+            query_threads.append(threading.current_thread())
+            return real_list_sessions()
+
+        app = self._app(b'data: {"result": {"structuredContent": {"success": true}}}\n\n')
+        middleware.invalidate_sessions_map()
+        with patch.object(server.storage, "list_sessions", side_effect=list_sessions):
+            await self._run(app, self._tool_call("notify", {"session_id": "brave-tiger"}))
+
+        assert query_threads
+        assert threading.current_thread() not in query_threads
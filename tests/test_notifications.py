@@ -1,6 +1,7 @@
 """Tests for notification functionality."""
 
 import os
+import subprocess
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -117,6 +118,24 @@ class TestNotify:
         call_args = mock_run.call_args[0][0]
         assert call_args == ["notify-send", "Test", "Hello"]
 
+    @patch.dict(os.environ, {"DISPLAY": ":0"})
+    @patch("agent_event_bus.helpers.platform.system")
+    @patch("agent_event_bus.helpers.shutil.which")
+    @patch("agent_event_bus.helpers.subprocess.run")
+    def test_notify_caches_notifier_lookup(self, mock_run, mock_which, mock_system):
+        """Test that the notifier binary is looked up once and stdout is discarded."""
+        mock_system.return_value = "Linux"
+        mock_which.return_value = "/usr/bin/notify-send"
+        mock_run.return_value = MagicMock()
+
+        notify(title="One", message="Hello")
+        notify(title="Two", message="Hello")
+
+        mock_which.assert_called_once_with("notify-send")
+        assert mock_run.call_count == 2
+        assert mock_run.call_args.kwargs["stdout"] is subprocess.DEVNULL
+        assert mock_run.call_args.kwargs["stderr"] is subprocess.PIPE
+
     @patch.dict(os.environ, {"DISPLAY": "", "DBUS_SESSION_BUS_ADDRESS": ""}, clear=False)
     @patch("agent_event_bus.helpers.platform.system")
     def test_notify_linux_headless(self, mock_system):
@@ -350,3 +369,26 @@ class TestAutoNotifyOnDM:
         call_kwargs = mock_notify.call_args.kwargs
         # Should contain the special characters
         assert "🎉" in call_kwargs["message"] or "Hello" in call_kwargs["message"]
+
+    def test_dm_notification_uses_queue_when_running(self, monkeypatch):
+        """Test that DMs are handed to the notification queue instead of sent inline."""
+        from agent_event_bus.background import NotificationQueue
+
+        sent = MagicMock(return_value=True)
+        notifier = NotificationQueue(sent)
+        monkeypatch.setattr(server, "_notifier", notifier)
+
+        with patch("agent_event_bus.server.send_notification") as inline:
+            target = register_session(name="target", machine="test", cwd="/test")
+            publish_event(
+                event_type="test",
+                payload="queued hello",
+                channel=f"session:{target['session_id']}",
+            )
+            inline.assert_not_called()
+
+        notifier.start()
+        notifier.stop(timeout=5)
+
+        sent.assert_called_once()
+        assert "queued hello" in sent.call_args.kwargs["message"]
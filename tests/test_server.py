@@ -7,7 +7,8 @@ from datetime import datetime
 
 import pytest
 
-from agent_event_bus import server
+from agent_event_bus import helpers, server
+from agent_event_bus.background import SessionWriteQueue
 from agent_event_bus.storage import Session, SQLiteStorage
 
 # Access the underlying functions from FunctionTool wrappers
@@ -43,7 +44,15 @@ class TestRegisterSession:
         result = register_session(name="test-session")
 
         assert result["machine"] == socket.gethostname()
-        assert "cwd" in result
+        assert result["cwd"] == server.DEFAULT_CWD
+
+    def test_registration_event_shares_session_timestamp(self):
+        """Test that the session_registered event is stamped with the registration time."""
+        result = register_session(name="test-session", machine="remote-host")
+
+        session = server.storage.get_session(result["session_id"])
+        events, _ = server.storage.get_events(event_types=["session_registered"])
+        assert events[0].timestamp == session.registered_at
 
     def test_resume_existing_session(self):
         """Test resuming an existing session with same machine+client_id."""
@@ -160,6 +169,8 @@ class TestListSessions:
 
         # Session should be deleted
         assert server.storage.get_session("dead-session") is None
+        # Its cached liveness result goes with it
+        assert 999999999 not in helpers._liveness_cache
 
     def test_list_sessions_ordered_by_most_recent_activity(self):
         """Test that sessions are returned most recently active first."""
@@ -178,10 +189,12 @@ class TestListSessions:
         names = [s["name"] for s in result]
         assert names == ["newest", "middle", "oldest"]
 
-    def test_list_sessions_ordering_reflects_heartbeat_updates(self):
-        """Test that ordering updates when heartbeat is refreshed."""
+    def test_list_sessions_ordering_reflects_heartbeat_updates(self, monkeypatch):
+        """Test that ordering updates when heartbeat is refreshed (once the cache expires)."""
         import time
 
+        monkeypatch.setattr(server, "LIVE_SESSIONS_TTL", 0)
+
         # Register sessions
         reg1 = register_session(name="first", machine="remote-1", cwd="/path1")
         time.sleep(0.01)
@@ -200,6 +213,105 @@ class TestListSessions:
         assert result[0]["name"] == "first"
 
 
+class TestLiveSessionsCache:
+    """Tests for the short-lived liveness sweep cache."""
+
+    def test_heartbeat_keeps_cache(self):
+        """Test that a persisted heartbeat doesn't throw away the cached sweep."""
+        reg = register_session(name="cached", machine="remote-host")
+        list_sessions()
+        cached = server._live_sessions_cache
+
+        server._auto_heartbeat(reg["session_id"])
+
+        assert server._live_sessions_cache is cached
+
+    def test_repeated_calls_reuse_sweep(self, monkeypatch):
+        """Test that calls within the TTL don't re-check client liveness."""
+        register_session(name="cached", machine="remote-host", client_id="abc123")
+
+        calls = []
+        monkeypatch.setattr(server, "is_client_alive", lambda *a: calls.append(a) or True)
+
+        list_sessions()
+        list_sessions()
+        assert len(calls) == 1
+
+    def test_sweep_reruns_after_ttl(self, monkeypatch):
+        """Test that an expired cache triggers a fresh sweep."""
+        register_session(name="cached", machine="remote-host", client_id="abc123")
+        monkeypatch.setattr(server, "LIVE_SESSIONS_TTL", 0)
+
+        calls = []
+        monkeypatch.setattr(server, "is_client_alive", lambda *a: calls.append(a) or True)
+
+        list_sessions()
+        list_sessions()
+        assert len(calls) == 2
+
+    def test_register_and_unregister_invalidate(self):
+        """Test that membership changes are visible immediately."""
+        assert list_sessions() == []
+
+        reg = register_session(name="new", machine="remote-host")
+        assert [s["name"] for s in list_sessions()] == ["new"]
+
+        unregister_session(session_id=reg["session_id"])
+        assert list_sessions() == []
+
+
+class TestStaleSessionCleanupThrottle:
+    """Tests for throttling stale-session sweeps."""
+
+    def test_cleanup_runs_once_per_interval(self, monkeypatch):
+        """Test that repeated RPCs within the interval sweep only once."""
+        calls = []
+        monkeypatch.setattr(server.storage, "cleanup_stale_sessions", lambda: calls.append(1) or [])
+
+        get_events()
+        get_events()
+        register_session(name="test", machine="remote-host")
+        assert len(calls) == 1
+
+    def test_cleanup_reruns_after_interval(self, monkeypatch):
+        """Test that a sweep runs again once the interval has elapsed."""
+        calls = []
+        monkeypatch.setattr(server.storage, "cleanup_stale_sessions", lambda: calls.append(1) or [])
+        monkeypatch.setattr(server, "STALE_CLEANUP_INTERVAL", 0)
+
+        get_events()
+        get_events()
+        assert len(calls) == 2
+
+    def test_sweep_forgets_swept_sessions(self, monkeypatch):
+        """Test that a sweep drops in-memory state for the sessions it deleted."""
+        reg = register_session(name="stale", machine="remote-host")
+        session_id = reg["session_id"]
+        publish_event("event1", "payload1", session_id=session_id)
+        get_events(session_id=session_id)
+        get_events(session_id=session_id, resume=True)  # Empty poll starts a streak
+        assert session_id in server._last_persisted_heartbeat
+        assert session_id in server._last_cursor_write
+        assert session_id in server._empty_poll_streak
+
+        monkeypatch.setattr(server.storage, "cleanup_stale_sessions", lambda: [session_id])
+        server._sweep_stale_sessions()
+
+        assert session_id not in server._last_persisted_heartbeat
+        assert session_id not in server._last_cursor_write
+        assert session_id not in server._empty_poll_streak
+
+    def test_no_inline_cleanup_with_background_sweeper(self, monkeypatch):
+        """Test that RPCs leave sweeping to the background sweeper when it runs."""
+        calls = []
+        monkeypatch.setattr(server.storage, "cleanup_stale_sessions", lambda: calls.append(1) or [])
+        monkeypatch.setattr(server, "_stale_sweeper", object())
+
+        get_events()
+        register_session(name="test", machine="remote-host")
+        assert calls == []
+
+
 class TestPublishEvent:
     """Tests for publish_event tool."""
 
@@ -257,6 +369,64 @@ class TestPublishEvent:
         assert session.last_heartbeat >= original_heartbeat
 
 
+class TestPayloadLimits:
+    """Tests for payload previews and the hard payload cap."""
+
+    def test_preview_short_text_unchanged(self):
+        """Test that text within the limit is returned as-is."""
+        assert server._preview("short", limit=10) == "short"
+        assert server._preview("exactly10!", limit=10) == "exactly10!"
+
+    def test_preview_truncates_long_text(self):
+        """Test that long text is cut at the limit with an ellipsis."""
+        assert server._preview("abcdefghijk", limit=10) == "abcdefghij..."
+
+    def test_publish_truncates_oversized_payload(self, monkeypatch, caplog):
+        """Test that payloads over MAX_PAYLOAD_CHARS are truncated before storage."""
+        monkeypatch.setattr(server, "MAX_PAYLOAD_CHARS", 10)
+
+        result = publish_event("big", "x" * 25)
+
+        assert result["payload"] == "x" * 10
+        events, _ = server.storage.get_events(cursor=str(result["event_id"] - 1), order="asc")
+        assert events[0].payload == "x" * 10
+        assert "Truncating big payload from 25 to 10 chars" in caplog.text
+
+
+class TestPublishEventBatching:
+    """Tests for publish_event routing through the event batcher."""
+
+    def test_publish_uses_running_batcher(self, monkeypatch):
+        """With a batcher running, publish_event returns the batched event's ID."""
+        from agent_event_bus.background import EventBatcher
+
+        batcher = EventBatcher(server.storage)
+        batcher.start()
+        monkeypatch.setattr(server, "_event_batcher", batcher)
+        cursor = server.storage.get_cursor()
+        try:
+            result = publish_event("batched", "payload")
+        finally:
+            batcher.stop(timeout=5)
+
+        events, _ = server.storage.get_events(cursor=cursor)
+        assert [(e.id, e.event_type) for e in events] == [(result["event_id"], "batched")]
+
+    def test_publish_falls_back_when_batcher_stalls(self, monkeypatch):
+        """If the batcher never picks the event up, publish_event inserts directly."""
+        from agent_event_bus.background import EventBatcher
+
+        stalled = EventBatcher(server.storage)  # Never started
+        monkeypatch.setattr(server, "_event_batcher", stalled)
+        monkeypatch.setattr(server, "PUBLISH_BATCH_TIMEOUT", 0.01)
+        cursor = server.storage.get_cursor()
+
+        result = publish_event("direct", "payload")
+
+        events, _ = server.storage.get_events(cursor=cursor)
+        assert [(e.id, e.event_type) for e in events] == [(result["event_id"], "direct")]
+
+
 class TestGetEvents:
     """Tests for get_events tool."""
 
@@ -351,6 +521,57 @@ class TestGetEvents:
         assert "type2" in types
 
 
+class TestGetEventsPollInterval:
+    """Tests for the suggested_next_poll_ms backoff hint."""
+
+    def test_anonymous_poll_gets_base_interval(self):
+        """Test that polls without a session_id always get the minimum interval."""
+        first = get_events()
+        second = get_events()
+        assert first["suggested_next_poll_ms"] == server.POLL_INTERVAL_MIN_MS
+        assert second["suggested_next_poll_ms"] == server.POLL_INTERVAL_MIN_MS
+
+    def test_unregistered_session_not_tracked(self):
+        """Test that external session IDs get the base interval and leave no streak behind."""
+        for _ in range(3):
+            result = get_events(session_id="external-id")
+        assert result["suggested_next_poll_ms"] == server.POLL_INTERVAL_MIN_MS
+        assert "external-id" not in server._empty_poll_streak
+
+    def test_empty_polls_back_off(self):
+        """Test that consecutive empty polls increase the suggested interval."""
+        reg = register_session(name="poller", machine="test-machine", cwd="/test/repo")
+        session_id = reg["session_id"]
+        get_events(session_id=session_id, resume=True)  # Drain backlog
+
+        intervals = [
+            get_events(session_id=session_id, resume=True)["suggested_next_poll_ms"]
+            for _ in range(3)
+        ]
+        assert intervals[0] < intervals[1] < intervals[2]
+
+    def test_backoff_is_capped(self):
+        """Test that the suggested interval never exceeds the maximum."""
+        reg = register_session(name="poller", machine="test-machine", cwd="/test/repo")
+        session_id = reg["session_id"]
+
+        for _ in range(30):
+            result = get_events(session_id=session_id, resume=True)
+        assert result["suggested_next_poll_ms"] == server.POLL_INTERVAL_MAX_MS
+
+    def test_events_reset_backoff(self):
+        """Test that receiving events resets the interval to the minimum."""
+        reg = register_session(name="poller", machine="test-machine", cwd="/test/repo")
+        session_id = reg["session_id"]
+        for _ in range(5):
+            get_events(session_id=session_id, resume=True)
+
+        publish_event("wake_up", "new work")
+        result = get_events(session_id=session_id, resume=True)
+        assert len(result["events"]) == 1
+        assert result["suggested_next_poll_ms"] == server.POLL_INTERVAL_MIN_MS
+
+
 class TestGetEventsOrdering:
     """Tests for get_events ordering behavior."""
 
@@ -552,6 +773,56 @@ class TestAutoHeartbeat:
         updated = server.storage.get_session(session_id).last_heartbeat
         assert updated >= original
 
+    def test_auto_heartbeat_debounces_writes(self):
+        """Test that repeated heartbeats within the debounce window skip the DB."""
+        reg = register_session(name="test", client_id=str(os.getpid()))
+        session_id = reg["session_id"]
+
+        server._auto_heartbeat(session_id)
+        first = server.storage.get_session(session_id).last_heartbeat
+
+        import time
+
+        time.sleep(0.01)
+        server._auto_heartbeat(session_id)
+
+        assert server.storage.get_session(session_id).last_heartbeat == first
+
+    def test_auto_heartbeat_writes_after_debounce_window(self, monkeypatch):
+        """Test that a heartbeat is persisted again once the window has passed."""
+        from datetime import timedelta
+
+        reg = register_session(name="test", client_id=str(os.getpid()))
+        session_id = reg["session_id"]
+
+        server._auto_heartbeat(session_id)
+        first = server.storage.get_session(session_id).last_heartbeat
+
+        monkeypatch.setattr(server, "HEARTBEAT_DEBOUNCE", timedelta(0))
+        import time
+
+        time.sleep(0.01)
+        server._auto_heartbeat(session_id)
+
+        assert server.storage.get_session(session_id).last_heartbeat > first
+
+    def test_unregister_clears_debounce_state(self):
+        """Test that unregistering forgets the session's last persisted heartbeat."""
+        reg = register_session(name="test", client_id=str(os.getpid()))
+        session_id = reg["session_id"]
+
+        server._auto_heartbeat(session_id)
+        assert session_id in server._last_persisted_heartbeat
+
+        unregister_session(session_id=session_id)
+        assert session_id not in server._last_persisted_heartbeat
+
+    def test_auto_heartbeat_skips_unregistered_session(self):
+        """Test that heartbeats for unknown session IDs leave no debounce entry."""
+        server._auto_heartbeat("external-id")
+        server._auto_heartbeat("external-id")
+        assert "external-id" not in server._last_persisted_heartbeat
+
     def test_auto_heartbeat_ignores_anonymous(self):
         """Test that auto_heartbeat ignores anonymous session."""
         # Should not raise
@@ -707,6 +978,50 @@ class TestSessionCursorTracking:
         # Should get the saved cursor, not current position
         assert reg2["cursor"] == saved_cursor
 
+    @pytest.fixture
+    def slow_writer(self, monkeypatch):
+        """A started write-behind queue that won't flush on its own during the test."""
+        writer = SessionWriteQueue(server.storage, batch_window=60)
+        writer.start()
+        monkeypatch.setattr(server, "_session_writer", writer)
+        yield writer
+        monkeypatch.setattr(server, "_session_writer", None)
+        writer.stop(timeout=5)
+
+    def test_resume_before_cursor_flush_does_not_replay(self, slow_writer):
+        """Test that resuming uses a cursor mark still queued for writing."""
+        reg = register_session(name="test", machine="remote-host", client_id="test-lag")
+        session_id = reg["session_id"]
+        for i in range(3):
+            publish_event(f"event{i}", "payload")
+
+        first = get_events(session_id=session_id, resume=True)
+        assert first["events"]
+        assert server.storage.get_session_cursor(session_id) is None  # Not flushed yet
+
+        assert get_events(session_id=session_id, resume=True)["events"] == []
+
+    def test_reregister_before_cursor_flush_gets_queued_mark(self, slow_writer):
+        """Test that a resumed registration returns a cursor mark still queued for writing."""
+        reg = register_session(name="test", machine="remote-host", client_id="test-lag2")
+        publish_event("event1", "payload1")
+        events = get_events(session_id=reg["session_id"], resume=True)["events"]
+        publish_event("event2", "payload2")  # Unseen, so the latest-event fallback is wrong
+
+        reg2 = register_session(name="test", machine="remote-host", client_id="test-lag2")
+
+        assert reg2["resumed"] is True
+        assert reg2["cursor"] == str(events[0]["id"])
+
+    def test_unregistered_session_gets_no_cursor_mark(self):
+        """Test that polling with an external session ID leaves no cursor mark behind."""
+        publish_event("event1", "payload1")
+
+        result = get_events(session_id="external-id")
+
+        assert result["events"]
+        assert "external-id" not in server._last_cursor_write
+
     def test_resumed_session_without_cursor_falls_back(self):
         """Test that resumed sessions without last_cursor get current position."""
         # Register initial session
@@ -744,6 +1059,26 @@ class TestSessionCursorTracking:
         # Cursor should have been updated
         assert cursor2 == result2["next_cursor"]
 
+    def test_cursor_never_moves_backwards(self, monkeypatch):
+        """Test that re-reading older events doesn't rewrite the high-water mark."""
+        reg = register_session(name="test", machine="remote-host", client_id="test-hwm")
+        session_id = reg["session_id"]
+
+        first = publish_event("event1", "payload1")
+        publish_event("event2", "payload2")
+        get_events(session_id=session_id)
+        high_water = server.storage.get_session(session_id).last_cursor
+
+        writes = []
+        monkeypatch.setattr(
+            server.storage, "update_session_cursor", lambda *args: writes.append(args)
+        )
+        # Page back to event1 only: older than what was already seen
+        get_events(session_id=session_id, cursor=str(first["event_id"] - 1), limit=1, order="asc")
+
+        assert writes == []
+        assert server.storage.get_session(session_id).last_cursor == high_water
+
     def test_cursor_not_persisted_without_session_id(self):
         """Test that cursor is not persisted when no session_id provided."""
         # Publish events
@@ -1054,6 +1389,25 @@ class TestUsageGuide:
         result = server.usage_guide.fn()
         assert result == expected_content
 
+    def test_usage_guide_rereads_after_edit(self, tmp_path, monkeypatch):
+        """Test that the cached guide is refreshed when the file changes."""
+        guide = tmp_path / "guide.md"
+        guide.write_text("first")
+        monkeypatch.setattr(server, "GUIDE_PATH", guide)
+        monkeypatch.setattr(server, "_guide_cache", None)
+
+        assert server.usage_guide.fn() == "first"
+
+        guide.write_text("second")
+        os.utime(guide, ns=(0, guide.stat().st_mtime_ns + 1_000_000))
+        assert server.usage_guide.fn() == "second"
+
+    def test_usage_guide_missing_file(self, tmp_path, monkeypatch):
+        """Test the fallback text when guide.md is missing."""
+        monkeypatch.setattr(server, "GUIDE_PATH", tmp_path / "missing.md")
+
+        assert "Guide file not found" in server.usage_guide.fn()
+
 
 class TestChannelValidation:
     """Tests for channel format validation."""
@@ -1086,5 +1440,7 @@ class TestChannelValidation:
             publish_event("test", "payload", channel="session:abc-123")
             publish_event("test", "payload", channel="repo:my-repo")
             publish_event("test", "payload", channel="machine:localhost")
+            publish_event("test", "payload", channel="custom:")  # Unknown types aren't checked
+            publish_event("test", "payload", channel="session")  # No separator
 
         assert "Invalid" not in caplog.text
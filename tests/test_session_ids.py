@@ -39,6 +39,16 @@ class TestGenerateSessionId:
         assert len(ADJECTIVES) >= 10, "ADJECTIVES list too small"
         assert len(ANIMALS) >= 10, "ANIMALS list too small"
 
+    def test_covers_full_range(self, monkeypatch):
+        """The single draw maps its endpoints to the first and last word pairs."""
+        import random
+
+        monkeypatch.setattr(random, "randrange", lambda n: 0)
+        assert generate_session_id() == f"{ADJECTIVES[0]}-{ANIMALS[0]}"
+
+        monkeypatch.setattr(random, "randrange", lambda n: n - 1)
+        assert generate_session_id() == f"{ADJECTIVES[-1]}-{ANIMALS[-1]}"
+
     def test_word_lists_lowercase(self):
         """All words in lists are lowercase alphabetic."""
         for word in ADJECTIVES:
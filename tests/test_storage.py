@@ -3,7 +3,7 @@
 import sqlite3
 from datetime import datetime, timedelta
 
-from agent_event_bus.storage import SESSION_TIMEOUT, Session, SQLiteStorage
+from agent_event_bus.storage import SCHEMA_VERSION, SESSION_TIMEOUT, Session, SQLiteStorage
 
 
 class TestSessionOperations:
@@ -35,10 +35,80 @@ class TestSessionOperations:
         assert retrieved.repo == "project"
         assert retrieved.client_id == "12345"
 
+    def test_session_channels_cached(self):
+        """Test that implicit channels are derived once per Session instance."""
+        now = datetime.now()
+        session = Session(
+            id="abc",
+            display_id="brave-tiger",
+            name="test",
+            machine="host-1",
+            cwd="/test/myrepo",
+            repo="myrepo",
+            registered_at=now,
+            last_heartbeat=now,
+        )
+        assert session.channels == ("all", "session:abc", "repo:myrepo", "machine:host-1")
+        assert session.channels is session.channels
+
     def test_get_nonexistent_session(self, storage):
         """Test getting a session that doesn't exist."""
         assert storage.get_session("nonexistent") is None
 
+    def test_channel_subscriber_counts(self, storage):
+        """Test per-channel counts cover all implicit channels of active sessions."""
+        now = datetime.now()
+        for session_id, repo, machine in (
+            ("a", "shared", "host-1"),
+            ("b", "shared", "host-2"),
+            ("gone", "shared", "host-1"),
+        ):
+            storage.add_session(
+                Session(
+                    id=session_id,
+                    display_id=f"{session_id}-display",
+                    name=session_id,
+                    machine=machine,
+                    cwd="/test",
+                    repo=repo,
+                    registered_at=now,
+                    last_heartbeat=now,
+                )
+            )
+        storage.delete_session("gone")
+
+        assert storage.channel_subscriber_counts() == [
+            ("all", 2),
+            ("machine:host-1", 1),
+            ("machine:host-2", 1),
+            ("repo:shared", 2),
+            ("session:a", 1),
+            ("session:b", 1),
+        ]
+
+    def test_get_sessions_by_ids(self, storage):
+        """Test bulk lookup returns only active sessions, keyed by ID."""
+        now = datetime.now()
+        for session_id in ("a", "b", "gone"):
+            storage.add_session(
+                Session(
+                    id=session_id,
+                    display_id=f"{session_id}-display",
+                    name=session_id,
+                    machine="localhost",
+                    cwd="/test",
+                    repo="test",
+                    registered_at=now,
+                    last_heartbeat=now,
+                )
+            )
+        storage.delete_session("gone")
+
+        found = storage.get_sessions_by_ids(["a", "b", "a", "gone", "missing"])
+        assert set(found) == {"a", "b"}
+        assert found["a"].name == "a"
+        assert storage.get_sessions_by_ids([]) == {}
+
     def test_update_session(self, storage):
         """Test updating an existing session (INSERT OR REPLACE)."""
         now = datetime.now()
@@ -79,10 +149,53 @@ class TestSessionOperations:
         assert storage.delete_session("test-123") is True
         assert storage.get_session("test-123") is None
 
+    def test_session_exists(self, storage):
+        """Test existence checks for active, deleted, and unknown sessions."""
+        now = datetime.now()
+        storage.add_session(
+            Session(
+                id="exists-1",
+                display_id="exists-display",
+                name="test-session",
+                machine="localhost",
+                cwd="/home/user/project",
+                repo="project",
+                registered_at=now,
+                last_heartbeat=now,
+            )
+        )
+        assert storage.session_exists("exists-1") is True
+        assert storage.session_exists("missing") is False
+
+        storage.delete_session("exists-1")
+        assert storage.session_exists("exists-1") is False
+
     def test_delete_nonexistent_session(self, storage):
         """Test deleting a session that doesn't exist."""
         assert storage.delete_session("nonexistent") is False
 
+    def test_delete_sessions(self, storage):
+        """Test soft-deleting several sessions at once."""
+        now = datetime.now()
+        for i in range(3):
+            storage.add_session(
+                Session(
+                    id=f"bulk-{i}",
+                    display_id=f"bulk-display-{i}",
+                    name="test-session",
+                    machine="localhost",
+                    cwd="/home/user/project",
+                    repo="project",
+                    registered_at=now,
+                    last_heartbeat=now,
+                )
+            )
+        storage.delete_session("bulk-2")
+
+        assert storage.delete_sessions(["bulk-0", "bulk-2", "missing"]) == 1
+        assert [s.id for s in storage.list_sessions()] == ["bulk-1"]
+        assert storage.delete_sessions([]) == 0
+
     def test_list_sessions(self, storage):
         """Test listing all sessions."""
         now = datetime.now()
@@ -198,6 +311,76 @@ class TestHeartbeat:
         """Test updating heartbeat for nonexistent session."""
         assert storage.update_heartbeat("nonexistent", datetime.now()) is False
 
+    def test_update_heartbeats_bulk(self, storage):
+        """Test bulk heartbeat update touches only the given active sessions."""
+        now = datetime.now()
+        for sid in ("s1", "s2", "s3"):
+            storage.add_session(
+                Session(
+                    id=sid,
+                    display_id=f"{sid}-display",
+                    name=sid,
+                    machine="localhost",
+                    cwd="/test",
+                    repo="test",
+                    registered_at=now,
+                    last_heartbeat=now,
+                )
+            )
+
+        later = now + timedelta(hours=1)
+        storage.update_heartbeats({"s1": later, "s2": later, "missing": later})
+
+        assert storage.get_session("s1").last_heartbeat == later
+        assert storage.get_session("s2").last_heartbeat == later
+        assert storage.get_session("s3").last_heartbeat == now
+
+    def test_update_session_cursors_bulk(self, storage):
+        """Test bulk cursor update."""
+        now = datetime.now()
+        for sid in ("s1", "s2"):
+            storage.add_session(
+                Session(
+                    id=sid,
+                    display_id=f"{sid}-display",
+                    name=sid,
+                    machine="localhost",
+                    cwd="/test",
+                    repo="test",
+                    registered_at=now,
+                    last_heartbeat=now,
+                )
+            )
+
+        storage.update_session_cursors({"s1": "10", "s2": "20"})
+
+        assert storage.get_session("s1").last_cursor == "10"
+        assert storage.get_session("s2").last_cursor == "20"
+
+    def test_get_session_cursor(self, storage):
+        """Test reading just the saved cursor of an active session."""
+        now = datetime.now()
+        storage.add_session(
+            Session(
+                id="s1",
+                display_id="s1-display",
+                name="s1",
+                machine="localhost",
+                cwd="/test",
+                repo="test",
+                registered_at=now,
+                last_heartbeat=now,
+            )
+        )
+        assert storage.get_session_cursor("s1") is None
+
+        storage.update_session_cursor("s1", "42")
+        assert storage.get_session_cursor("s1") == "42"
+
+        storage.delete_session("s1")
+        assert storage.get_session_cursor("s1") is None
+        assert storage.get_session_cursor("missing") is None
+
 
 class TestStaleSessionCleanup:
     """Tests for stale session cleanup."""
@@ -233,8 +416,7 @@ class TestStaleSessionCleanup:
         )
         storage.add_session(stale)
 
-        count = storage.cleanup_stale_sessions()
-        assert count == 1
+        assert storage.cleanup_stale_sessions() == ["stale"]
 
         assert storage.get_session("fresh") is not None
         assert storage.get_session("stale") is None
@@ -256,11 +438,11 @@ class TestStaleSessionCleanup:
         storage.add_session(session)
 
         # Should not be cleaned with default timeout
-        assert storage.cleanup_stale_sessions() == 0
+        assert storage.cleanup_stale_sessions() == []
         assert storage.get_session("test") is not None
 
         # Should be cleaned with 30 second timeout
-        assert storage.cleanup_stale_sessions(timeout_seconds=30) == 1
+        assert storage.cleanup_stale_sessions(timeout_seconds=30) == ["test"]
         assert storage.get_session("test") is None
 
 
@@ -371,6 +553,60 @@ class TestEventOperations:
         assert len(events) == 2  # Events after id=1
 
 
+class TestGetEventsRaw:
+    """Tests for get_events_raw (JSON-ready dict rows)."""
+
+    def test_matches_get_events(self, storage):
+        """Test that raw rows carry the same data, with ISO string timestamps."""
+        added = storage.add_event("e1", "msg1", "s1", channel="repo:myrepo")
+        storage.add_event("e2", "msg2", "s1")
+
+        raw, raw_cursor = storage.get_events_raw(order="asc")
+        events, cursor = storage.get_events(order="asc")
+
+        assert raw_cursor == cursor
+        assert raw[0] == {
+            "id": added.id,
+            "event_type": "e1",
+            "payload": "msg1",
+            "session_id": "s1",
+            "timestamp": added.timestamp.isoformat(),
+            "channel": "repo:myrepo",
+        }
+        assert [r["id"] for r in raw] == [e.id for e in events]
+
+    def test_filters_apply(self, storage):
+        """Test that channel and type filters behave as in get_events."""
+        storage.add_event("task_completed", "t1", "s1", channel="repo:myrepo")
+        storage.add_event("task_completed", "t2", "s1", channel="all")
+        storage.add_event("ci_completed", "c1", "s1", channel="repo:myrepo")
+
+        raw, _ = storage.get_events_raw(channels=["repo:myrepo"], event_types=["task_completed"])
+        assert [r["payload"] for r in raw] == ["t1"]
+
+
+class TestEventsQueryShapes:
+    """Tests for the cached per-shape events SQL."""
+
+    def test_unfiltered_poll_query(self):
+        """Test the common poll shape compiles to a plain cursor range scan."""
+        from agent_event_bus.storage import EVENT_COLUMNS, _events_query
+
+        query = _events_query(EVENT_COLUMNS, "desc", True, 0, 0)
+        assert query == (
+            f"SELECT {EVENT_COLUMNS} FROM events WHERE id > ? ORDER BY id DESC LIMIT ?"
+        )
+        assert _events_query(EVENT_COLUMNS, "desc", True, 0, 0) is query
+
+    def test_filtered_query_placeholders(self):
+        """Test filter predicates get one placeholder per value."""
+        from agent_event_bus.storage import EVENT_COLUMNS, _events_query
+
+        query = _events_query(EVENT_COLUMNS, "asc", False, 2, 1)
+        assert "WHERE channel IN (?,?) AND event_type IN (?)" in query
+        assert query.endswith("ORDER BY id ASC LIMIT ?")
+
+
 class TestEventChannelFiltering:
     """Tests for event channel filtering."""
 
@@ -455,6 +691,17 @@ class TestEventTypeFiltering:
         types = {e.event_type for e in events}
         assert types == {"task_completed", "ci_completed"}
 
+    def test_get_events_duplicate_filter_values(self, storage):
+        """Test that repeated filter values don't duplicate results."""
+        storage.add_event("task_completed", "task 1", "s1", channel="repo:myrepo")
+        storage.add_event("ci_completed", "CI 1", "s1", channel="all")
+
+        events, _ = storage.get_events(
+            channels=["repo:myrepo", "repo:myrepo"],
+            event_types=["task_completed", "task_completed"],
+        )
+        assert [e.event_type for e in events] == ["task_completed"]
+
 
 class TestDatabaseInitialization:
     """Tests for database initialization."""
@@ -535,6 +782,44 @@ class TestDatabaseInitialization:
             f"Expected index on (machine, client_id), found: {columns}"
         )
 
+    def test_event_filter_indexes(self, temp_db):
+        """Test that channel and event_type filters are backed by (column, id) indexes."""
+        import sqlite3
+
+        SQLiteStorage(db_path=temp_db)
+
+        conn = sqlite3.connect(temp_db)
+        channel_cols = [row[2] for row in conn.execute("PRAGMA index_info(idx_events_channel)")]
+        type_cols = [row[2] for row in conn.execute("PRAGMA index_info(idx_events_type)")]
+        conn.close()
+
+        assert channel_cols == ["channel", "id"]
+        assert type_cols == ["event_type", "id"]
+
+    def test_active_sessions_partial_index(self, temp_db):
+        """Test that active-session queries use the partial heartbeat index."""
+        storage = SQLiteStorage(db_path=temp_db)
+
+        with storage._connect() as conn:
+            plan = " ".join(
+                row[3]
+                for row in conn.execute(
+                    "EXPLAIN QUERY PLAN SELECT * FROM sessions "
+                    "WHERE deleted_at IS NULL ORDER BY last_heartbeat DESC"
+                )
+            )
+        assert "idx_sessions_active" in plan
+
+    def test_uses_wal_journal_mode(self, temp_db):
+        """Test that the database is switched to WAL and connections get tuned pragmas."""
+        storage = SQLiteStorage(db_path=temp_db)
+        assert storage.journal_mode == "wal"
+
+        with storage._connect() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 30000
+
     def test_migrate_v1_to_v2_schema(self, tmp_path):
         """Test v1→v2 migration adds display_id and deleted_at columns."""
         import sqlite3
@@ -607,7 +892,60 @@ class TestDatabaseInitialization:
         cursor = conn.execute("SELECT version FROM schema_version")
         version = cursor.fetchone()[0]
         conn.close()
-        assert version == 2, f"Schema version should be 2, got {version}"
+        assert version == SCHEMA_VERSION, (
+            f"Schema version should be {SCHEMA_VERSION}, got {version}"
+        )
+
+
+class TestConnectionReuse:
+    """Tests for per-thread persistent connections."""
+
+    def test_same_thread_reuses_connection(self, storage):
+        """Test that repeated calls on one thread share a connection."""
+        with storage._connect() as first:
+            pass
+        with storage._connect() as second:
+            pass
+        assert first is second
+
+    def test_threads_get_separate_connections(self, storage):
+        """Test that each thread opens its own connection."""
+        import threading
+
+        with storage._connect() as main_conn:
+            pass
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(storage.session_count()))
+        thread.start()
+        thread.join()
+
+        assert other == [0]
+        assert storage._local.conn is main_conn
+
+    def test_error_rolls_back(self, storage):
+        """Test that a failed block doesn't leave a partial write behind."""
+        try:
+            with storage._connect() as conn:
+                conn.execute(
+                    "INSERT INTO events (event_type, payload, session_id, timestamp) "
+                    "VALUES ('e', 'p', 's', ?)",
+                    (datetime.now(),),
+                )
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+
+        events, _ = storage.get_events()
+        assert events == []
+
+    def test_close_reopens_on_next_use(self, storage):
+        """Test that close() drops the connection and the next call reopens one."""
+        storage.add_event("e1", "msg1", "s1")
+        storage.close()
+
+        events, _ = storage.get_events()
+        assert len(events) == 1
 
 
 class TestSoftDelete: